@@ -0,0 +1,135 @@
+# boards.py
+# ---------
+
+
+"""
+Layouts for the benchmarks in this directory and in Search/benchmarks.
+getLayout loads a layout by name through layout.py when it is there.
+pacman.py imports layout at the top, so without layout.py this module puts
+a stand-in for it in sys.modules, serving the copies of the classic boards
+below read by BoardLayout; import it before pacman.
+
+BoardLayout builds its walls from the game.Grid of whichever project
+imports it, so that project's directory goes on sys.path first.
+"""
+
+import sys
+import types
+
+from game import Grid
+
+
+BOARDS = {
+    'smallClassic': [
+        '%%%%%%%%%%%%%%%%%%%%',
+        '%......%G  G%......%',
+        '%.%%...%%  %%...%%.%',
+        '%.%o.%........%.o%.%',
+        '%.%%.%.%%%%%%.%.%%.%',
+        '%........P.........%',
+        '%%%%%%%%%%%%%%%%%%%%',
+    ],
+    'mediumClassic': [
+        '%%%%%%%%%%%%%%%%%%%%',
+        '%o...%........%....%',
+        '%.%%.%.%%%%%%.%.%%.%',
+        '%.%..............%.%',
+        '%.%.%%.%%  %%.%%.%.%',
+        '%......%G  G%......%',
+        '%.%.%%.%%%%%%.%%.%.%',
+        '%.%..............%.%',
+        '%.%%.%.%%%%%%.%.%%.%',
+        '%....%...P....%...o%',
+        '%%%%%%%%%%%%%%%%%%%%',
+    ],
+    'originalClassic': [
+        '%%%%%%%%%%%%%%%%%%%%%%%%%%%%',
+        '%............%%............%',
+        '%.%%%%.%%%%%.%%.%%%%%.%%%%.%',
+        '%o%%%%.%%%%%.%%.%%%%%.%%%%o%',
+        '%.%%%%.%%%%%.%%.%%%%%.%%%%.%',
+        '%..........................%',
+        '%.%%%%.%%.%%%%%%%%.%%.%%%%.%',
+        '%.%%%%.%%.%%%%%%%%.%%.%%%%.%',
+        '%......%%....%%....%%......%',
+        '%%%%%%.%%%%% %% %%%%%.%%%%%%',
+        '%%%%%%.%%%%% %% %%%%%.%%%%%%',
+        '%%%%%%.%            %.%%%%%%',
+        '%%%%%%.% %%%%  %%%% %.%%%%%%',
+        '%     .  %G  GG  G%  .     %',
+        '%%%%%%.% %%%%%%%%%% %.%%%%%%',
+        '%%%%%%.%            %.%%%%%%',
+        '%%%%%%.% %%%%%%%%%% %.%%%%%%',
+        '%............%%............%',
+        '%.%%%%.%%%%%.%%.%%%%%.%%%%.%',
+        '%.%%%%.%%%%%.%%.%%%%%.%%%%.%',
+        '%o..%%.......  .......%%..o%',
+        '%%%.%%.%%.%%%%%%%%.%%.%%.%%%',
+        '%%%.%%.%%.%%%%%%%%.%%.%%.%%%',
+        '%......%%....%%....%%......%',
+        '%.%%%%%%%%%%.%%.%%%%%%%%%%.%',
+        '%.............P............%',
+        '%%%%%%%%%%%%%%%%%%%%%%%%%%%%',
+    ],
+}
+
+
+class BoardLayout:
+    """
+    The parts of layout.Layout that a GameState uses, read from the rows of
+    a layout file: % is a wall, . food, o a capsule, P Pacman and G a ghost.
+    """
+    def __init__(self, layoutText):
+        self.layoutText = layoutText
+        self.width = len(layoutText[0])
+        self.height = len(layoutText)
+        self.walls = Grid(self.width, self.height, False)
+        self.food = Grid(self.width, self.height, False)
+        self.capsules = []
+        pacmanPositions, ghostPositions = [], []
+        for row, line in enumerate(layoutText):
+            y = self.height - 1 - row # The first row is the top of the board
+            for x, char in enumerate(line):
+                if char == '%':
+                    self.walls[x][y] = True
+                elif char == '.':
+                    self.food[x][y] = True
+                elif char == 'o':
+                    self.capsules.append((x, y))
+                elif char == 'P':
+                    pacmanPositions.append((True, (x, y)))
+                elif char == 'G':
+                    ghostPositions.append((False, (x, y)))
+        self.agentPositions = pacmanPositions + sorted(ghostPositions) # layout.Layout orders ghosts by position
+        self.numGhosts = len(ghostPositions)
+
+    def getNumGhosts(self):
+        return self.numGhosts
+
+    def isWall(self, pos):
+        x, y = pos
+        return self.walls[x][y]
+
+    def deepCopy(self):
+        return BoardLayout(self.layoutText[:])
+
+
+def getBoard(name):
+    "The named board from BOARDS, or None if there is no such board"
+    if name not in BOARDS:
+        return None
+    return BoardLayout(BOARDS[name])
+
+
+def getLayout(name):
+    "The named layout, or None if there is no such layout"
+    return layout.getLayout(name)
+
+
+try:
+    import layout
+except ImportError:
+    layout = types.ModuleType('layout')
+    layout.Layout = BoardLayout
+    layout.getLayout = getBoard
+    sys.modules['layout'] = layout
@@ -0,0 +1,105 @@
+# expectimaxBenchmark.py
+# ----------------------
+
+
+"""
+Decision latency against win rate for expectimax settings: plays games
+against random ghosts with each SampledExpectimaxAgent configuration (and
+the plain ExpectimaxAgent) and reports the mean and worst time per move,
+the win rate and the average score.
+
+Configurations are separated by ';' and use the -a syntax of pacman.py.
+Games are played on GameStates directly, with no display or move timeout.
+
+> python benchmarks/expectimaxBenchmark.py -l mediumClassic,originalClassic -n 5 \\
+      -c "samples=0;samples=2;samples=3,jointGhosts=True;samples=3,jointGhosts=True,simulate=True"
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boards
+import pacman
+import multiAgents
+
+
+def makeAgent(config, depth, evalFn, seed):
+    """
+    An agent for one configuration string; 'plain' is ExpectimaxAgent, which
+    breaks ties with the random module (seeded by playGames)
+    """
+    if config == 'plain':
+        return multiAgents.ExpectimaxAgent(evalFn, str(depth))
+    args = pacman.parseAgentArgs(config)
+    args.setdefault('depth', str(depth))
+    args.setdefault('evalFn', evalFn)
+    args.setdefault('seed', str(seed))
+    return multiAgents.SampledExpectimaxAgent(**args)
+
+
+def playGame(gameLayout, agent, rand):
+    "Plays agent against ghosts moving at random; returns (move times, final state)"
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    if 'registerInitialState' in dir(agent):
+        agent.registerInitialState(state.deepCopy())
+    times = []
+    agentIndex = 0
+    while not (state.isWin() or state.isLose()):
+        if agentIndex == 0:
+            start = time.perf_counter()
+            action = agent.getAction(state)
+            times.append(time.perf_counter() - start)
+        else:
+            action = rand.choice(state.getLegalActions(agentIndex))
+        state = state.generateSuccessor(agentIndex, action)
+        agentIndex = (agentIndex + 1) % state.getNumAgents()
+    if 'final' in dir(agent):
+        agent.final(state)
+    return times, state
+
+
+def playGames(gameLayout, config, numGames, depth, evalFn):
+    "Returns (move times, wins, scores) over numGames games"
+    times, wins, scores = [], 0, []
+    for i in range(numGames):
+        random.seed(i)
+        gameTimes, state = playGame(gameLayout, makeAgent(config, depth, evalFn, i), random.Random(i))
+        times += gameTimes
+        wins += state.isWin()
+        scores.append(state.getScore())
+    return times, wins, scores
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/expectimaxBenchmark.py <options>')
+    parser.add_option('-l', '--layouts', dest='layouts', default='mediumClassic,originalClassic',
+                      help='Comma separated layouts [Default: %default]')
+    parser.add_option('-c', '--configs', dest='configs',
+                      default='plain;samples=0;samples=2;samples=3,jointGhosts=True;samples=3,jointGhosts=True,simulate=True',
+                      help='Agent configurations separated by ";" [Default: %default]')
+    parser.add_option('-n', '--numGames', type='int', dest='numGames', default=5)
+    parser.add_option('-d', '--depth', type='int', dest='depth', default=2)
+    parser.add_option('-f', '--evalFn', dest='evalFn', default='betterEvaluationFunction')
+    options, _ = parser.parse_args(argv)
+
+    print('%-16s %-48s %10s %10s %8s %10s' % ('layout', 'configuration', 'mean move', 'worst move', 'wins', 'avg score'))
+    for layoutName in options.layouts.split(','):
+        gameLayout = boards.getLayout(layoutName)
+        if gameLayout is None:
+            raise Exception('The layout ' + layoutName + ' cannot be found')
+        for config in options.configs.split(';'):
+            times, wins, scores = playGames(gameLayout, config, options.numGames, options.depth, options.evalFn)
+            print('%-16s %-48s %9.4fs %9.4fs %4d/%-3d %10.1f' %
+                  (layoutName, config, sum(times) / len(times), max(times), wins, options.numGames,
+                   sum(scores) / len(scores)))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
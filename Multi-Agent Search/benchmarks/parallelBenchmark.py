@@ -0,0 +1,92 @@
+# parallelBenchmark.py
+# --------------------
+
+
+"""
+Speedup of root-parallel search: times getAction of minimax, alpha-beta
+and expectimax over states from a random game, sequentially and with
+parallel=True for each worker count, and checks that the parallel search
+picks the same moves.  The pool is started before timing, so only the
+search is measured.
+
+> python benchmarks/parallelBenchmark.py -l mediumClassic -d 4 -w 2,4,8
+> python benchmarks/parallelBenchmark.py -a MinimaxAgent -w 8 -o splitGhosts=True,simulate=True
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boards
+import pacman
+import multiAgents
+
+
+def gameStates(gameLayout, count, seed):
+    "count states, one per Pacman turn, from a game of random moves"
+    rand = random.Random(seed)
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    states = []
+    while len(states) < count and not (state.isWin() or state.isLose()):
+        states.append(state)
+        for agentIndex in range(state.getNumAgents()):
+            if state.isWin() or state.isLose():
+                break
+            state = state.generateSuccessor(agentIndex, rand.choice(state.getLegalActions(agentIndex)))
+    return states
+
+
+def timeMoves(agent, states):
+    "Returns (seconds, moves) for getAction on every state"
+    moves = []
+    start = time.perf_counter()
+    for state in states:
+        random.seed(0) # the same tie breaks for every agent
+        moves.append(agent.getAction(state))
+    return time.perf_counter() - start, moves
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/parallelBenchmark.py <options>')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic')
+    parser.add_option('-a', '--agents', dest='agents', default='MinimaxAgent,AlphaBetaAgent,ExpectimaxAgent',
+                      help='Comma separated agents [Default: %default]')
+    parser.add_option('-d', '--depth', type='int', dest='depth', default=4)
+    parser.add_option('-f', '--evalFn', dest='evalFn', default='betterEvaluationFunction')
+    parser.add_option('-w', '--workers', dest='workers', default=str(os.cpu_count() or 1),
+                      help='Comma separated worker counts [Default: %default]')
+    parser.add_option('-o', '--options', dest='options', default=None,
+                      help='Agent options for every run, in the -a syntax of pacman.py')
+    parser.add_option('-n', '--numStates', type='int', dest='numStates', default=5)
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    options, _ = parser.parse_args(argv)
+
+    gameLayout = boards.getLayout(options.layout)
+    if gameLayout is None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    states = gameStates(gameLayout, options.numStates, options.seed)
+    agentOpts = pacman.parseAgentArgs(options.options)
+    agentOpts.update({'evalFn': options.evalFn, 'depth': str(options.depth)})
+
+    print('%-16s %8s %10s %8s %8s' % ('agent', 'workers', 'seconds', 'speedup', 'moves'))
+    for agentName in options.agents.split(','):
+        agentClass = getattr(multiAgents, agentName)
+        serialTime, serialMoves = timeMoves(agentClass(**agentOpts), states)
+        print('%-16s %8s %9.3fs %8s %8s' % (agentName, '-', serialTime, '1.00x', 'ok'))
+        for workers in options.workers.split(','):
+            agent = agentClass(parallel='True', workers=workers, **agentOpts)
+            agent.getExecutor().submit(len, ()).result() # start the pool before timing
+            seconds, moves = timeMoves(agent, states)
+            agent.final(None)
+            print('%-16s %8s %9.3fs %7.2fx %8s' % (agentName, workers, seconds, serialTime / seconds,
+                                                   'ok' if moves == serialMoves else 'DIFFER'))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
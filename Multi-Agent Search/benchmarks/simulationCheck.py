@@ -0,0 +1,142 @@
+# simulationCheck.py
+# ------------------
+
+
+"""
+Checks simulation.SimulationRules against the real PacmanRules and
+GhostRules, then times a search agent with and without simulate=True.
+
+Every state along a game is converted to a SimulationState, and for every
+agent the two must agree on the legal actions and, action by action, on the
+successors: agent positions, directions and scared timers, food, capsules,
+score, win and loss.  The games are recorded ones (pacman.py -r writes
+them) given as arguments, or else random games on the layout.
+
+> python benchmarks/simulationCheck.py -l mediumClassic -n 20
+> python benchmarks/simulationCheck.py recorded-game-1*
+"""
+
+import os
+import sys
+import time
+import pickle
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boards
+import pacman
+import multiAgents
+from simulation import SimulationState
+
+
+def describe(state):
+    "What both kinds of state must agree on, as comparable values"
+    agents = [(state.getPacmanPosition(), state.getPacmanState().configuration.direction, 0)]
+    for ghostState in state.getGhostStates():
+        agents.append((ghostState.getPosition(), ghostState.configuration.direction, ghostState.scaredTimer))
+    return (agents, sorted(state.getFood().asList()), list(state.getCapsules()), state.getScore(),
+            state.getNumFood(), state.isWin(), state.isLose())
+
+
+def checkState(gameState):
+    "Compares every successor of gameState with its simulated counterpart; returns how many"
+    simulated = SimulationState.fromGameState(gameState)
+    if describe(simulated) != describe(gameState):
+        raise Exception('Conversion differs:\n%s\n%s' % (describe(gameState), describe(simulated)))
+    checked = 0
+    for agentIndex in range(gameState.getNumAgents()):
+        legal = gameState.getLegalActions(agentIndex)
+        if simulated.getLegalActions(agentIndex) != legal:
+            raise Exception('Legal actions of agent %d differ: %s vs %s' %
+                            (agentIndex, legal, simulated.getLegalActions(agentIndex)))
+        for action in legal:
+            expected = describe(gameState.generateSuccessor(agentIndex, action))
+            got = describe(simulated.generateSuccessor(agentIndex, action))
+            if expected != got:
+                raise Exception('Agent %d playing %s:\nexpected %s\ngot      %s' % (agentIndex, action, expected, got))
+            checked += 1
+    return checked
+
+
+def replay(gameLayout, actions):
+    "Checks every state of a recorded game; returns the number of successors compared"
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    checked = 0
+    for agentIndex, action in actions:
+        if state.isWin() or state.isLose():
+            break
+        checked += checkState(state)
+        state = state.generateSuccessor(agentIndex, action)
+    return checked
+
+
+def randomGame(gameLayout, rand, maxMoves):
+    "A random game's moves, with Pacman preferring not to stop so that things happen"
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    actions = []
+    agentIndex = 0
+    while not (state.isWin() or state.isLose()) and len(actions) < maxMoves:
+        legal = state.getLegalActions(agentIndex)
+        if agentIndex == 0 and len(legal) > 1 and rand.random() < 0.9:
+            legal = [action for action in legal if action != 'Stop']
+        action = rand.choice(legal)
+        actions.append((agentIndex, action))
+        state = state.generateSuccessor(agentIndex, action)
+        agentIndex = (agentIndex + 1) % state.getNumAgents()
+    return actions
+
+
+def timeAgent(gameLayout, agentName, depth):
+    "Times one getAction of agentName from the start of the layout, without and with simulate"
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    times = []
+    for simulate in ['False', 'True']:
+        agent = getattr(multiAgents, agentName)(depth=str(depth), simulate=simulate)
+        random.seed(0)
+        start = time.perf_counter()
+        action = agent.getAction(state)
+        times.append((time.perf_counter() - start, action))
+    (before, slowAction), (after, fastAction) = times
+    print('%s depth %d: %.2fs -> %.2fs (%.1fx), %s / %s' %
+          (agentName, depth, before, after, before / after, slowAction, fastAction))
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/simulationCheck.py <options> [recorded games]')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic')
+    parser.add_option('-n', '--numGames', type='int', dest='numGames', default=10,
+                      help='Random games to check without recorded ones [Default: %default]')
+    parser.add_option('-m', '--maxMoves', type='int', dest='maxMoves', default=600)
+    parser.add_option('-a', '--agent', dest='agent', default='AlphaBetaAgent',
+                      help='Agent to time with and without simulate [Default: %default]')
+    parser.add_option('-d', '--depth', type='int', dest='depth', default=3)
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    options, recorded = parser.parse_args(argv)
+
+    checked = 0
+    if recorded:
+        for path in recorded:
+            with open(path, 'rb') as f:
+                game = pickle.load(f)
+            checked += replay(game['layout'], game['actions'])
+        gameLayout = game['layout']
+    else:
+        gameLayout = boards.getLayout(options.layout)
+        if gameLayout is None:
+            raise Exception('The layout ' + options.layout + ' cannot be found')
+        rand = random.Random(options.seed)
+        for i in range(options.numGames):
+            checked += replay(gameLayout, randomGame(gameLayout, rand, options.maxMoves))
+    print('%d successors match the reference rules' % checked)
+
+    if options.agent:
+        timeAgent(gameLayout, options.agent, options.depth)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,95 @@
+# successorBenchmark.py
+# ---------------------
+
+
+"""
+Successor generation throughput for the adversarial agents: runs one
+getAction() of a search agent from the start of a layout and reports how
+many GameState.generateSuccessor calls it made per second, both with the
+copy-on-write GameStateData and with CopyingGameStateData, which copies
+food, capsules and every AgentState into each successor as GameStateData
+used to.
+
+> python benchmarks/successorBenchmark.py -l mediumClassic -a MinimaxAgent -d 3,4
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boards
+import pacman
+import multiAgents
+from game import GameStateData
+
+
+class CopyingGameStateData(GameStateData):
+    "GameStateData before successors shared state: each packet copies all of it"
+    def __init__(self, prevState=None):
+        GameStateData.__init__(self, prevState)
+        if prevState != None:
+            self.food = prevState.food.shallowCopy()
+            self.capsules = prevState.capsules[:]
+            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self._ownedAgents = set(range(len(self.agentStates)))
+
+
+def countSuccessors(gameState, agent, dataType=GameStateData):
+    """
+    Runs agent.getAction(gameState), with pacman.GameState building its
+    successors' data as dataType; returns (successors generated, seconds)
+    """
+    generateSuccessor = pacman.GameState.generateSuccessor
+    count = [0]
+
+    def countingSuccessor(state, agentIndex, action):
+        count[0] += 1
+        return generateSuccessor(state, agentIndex, action)
+
+    pacman.GameState.generateSuccessor = countingSuccessor
+    pacman.GameStateData = dataType
+    try:
+        start = time.perf_counter()
+        agent.getAction(gameState)
+        seconds = time.perf_counter() - start
+    finally:
+        pacman.GameState.generateSuccessor = generateSuccessor
+        pacman.GameStateData = GameStateData
+    return count[0], seconds
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/successorBenchmark.py <options>')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='Layout to search from [Default: %default]')
+    parser.add_option('-a', '--agent', dest='agent', default='MinimaxAgent',
+                      help='Agent class in multiAgents.py [Default: %default]')
+    parser.add_option('-d', '--depths', dest='depths', default='3,4',
+                      help='Comma separated search depths [Default: %default]')
+    parser.add_option('-k', '--numghosts', type='int', dest='numGhosts', default=4,
+                      help='The maximum number of ghosts to use [Default: %default]')
+    options, _ = parser.parse_args(argv)
+
+    board = boards.getLayout(options.layout)
+    if board == None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    agentType = getattr(multiAgents, options.agent)
+
+    print('%6s %-14s %12s %9s %14s %8s' % ('depth', 'data', 'successors', 'seconds', 'successors/s', 'speedup'))
+    for depth in options.depths.split(','):
+        gameState = pacman.GameState()
+        gameState.initialize(board, options.numGhosts)
+        baseline = None
+        for name, dataType in [('copying', CopyingGameStateData), ('copy-on-write', GameStateData)]:
+            successors, seconds = countSuccessors(gameState, agentType(depth=depth), dataType)
+            rate = successors / seconds
+            baseline = baseline or rate
+            print('%6s %-14s %12d %9.2f %14.0f %7.2fx' % (depth, name, successors, seconds, rate, rate / baseline))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+# zobristCheck.py
+# ---------------
+
+
+"""
+Checks the incremental Zobrist keys GameStateData keeps (updateAgentKey,
+updateFoodKey, updateCapsuleKey and the rules that call them) against a
+full rehash().
+
+Random games are played on the layout and, at every state along them, the
+key the successors carried forward must equal the one a rehash of that
+state computes.  The last states of each game are then hashed again in a
+fresh (spawned) process, which meets the features in another order, and
+must hash the same there.
+
+> python benchmarks/zobristCheck.py -l mediumClassic -n 50
+"""
+
+import os
+import sys
+import random
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boards
+import pacman
+from simulationCheck import randomGame
+
+
+def rehashedKey(state):
+    "The key rehash() computes for state, leaving state itself alone"
+    copy = pacman.GameState(state)
+    copy.data.rehash()
+    return copy.data.zobristKey()
+
+
+def checkGame(gameLayout, actions):
+    """
+    Replays actions, comparing keys at every state.  Returns (states checked,
+    states with a scared ghost, the states reached).
+    """
+    state = pacman.GameState()
+    state.initialize(gameLayout, gameLayout.getNumGhosts())
+    states, scared = [state], 0
+    for agentIndex, action in actions:
+        state = state.generateSuccessor(agentIndex, action)
+        key, expected = state.data.zobristKey(), rehashedKey(state)
+        if key != expected:
+            raise Exception('Agent %d playing %s: incremental key %x, rehash %x\n%s' %
+                            (agentIndex, action, key, expected, state))
+        scared += any(ghost.scaredTimer > 0 for ghost in state.getGhostStates())
+        states.append(state)
+    return len(states), scared, states
+
+
+def stateHashes(states):
+    return [hash(state) for state in states]
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/zobristCheck.py <options>')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic')
+    parser.add_option('-n', '--numGames', type='int', dest='numGames', default=20)
+    parser.add_option('-m', '--maxMoves', type='int', dest='maxMoves', default=600)
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    options, _ = parser.parse_args(argv)
+
+    gameLayout = boards.getLayout(options.layout)
+    if gameLayout is None:
+        raise Exception('The layout ' + options.layout + ' cannot be found')
+    rand = random.Random(options.seed)
+    checked, scared, sample = 0, 0, []
+    for i in range(options.numGames):
+        gameChecked, gameScared, states = checkGame(gameLayout, randomGame(gameLayout, rand, options.maxMoves))
+        checked += gameChecked
+        scared += gameScared
+        sample += states[-10:]
+    print('%d states match a rehash (%d with a scared ghost)' % (checked, scared))
+
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        remote = pool.apply(stateHashes, (sample,))
+    if remote != stateHashes(sample):
+        raise Exception('%d of %d states hash differently in a fresh process' %
+                        (sum(a != b for a, b in zip(remote, stateHashes(sample))), len(sample)))
+    print('%d states hash the same in a fresh process' % len(sample))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -14,7 +14,11 @@
 
 from util import manhattanDistance
 from game import Directions
-import random, util
+from game import zobristKeys
+from simulation import SimulationState
+import random, util, time, collections, math, os
+import concurrent.futures
+import multiprocessing
 
 from game import Agent
 
@@ -108,12 +112,116 @@ class MultiAgentSearchAgent(Agent):
     Note: this is an abstract class: one that should not be instantiated.  It's
     only partially specified, and designed to be extended.  Agent (game.py)
     is another abstract class.
+
+    With simulate=True, minimax, alpha-beta and expectimax search a
+    simulation.SimulationState made from the root GameState, which generates
+    successors much faster than a GameState does.
+
+    With parallel=True they split the search at the root across a pool of
+    workers processes (all the cores by default), sending each subtree's
+    state over pickled.  splitGhosts=True makes minimax and expectimax split
+    the first ghost's replies too, which gives more, smaller jobs.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    simulate = False
+    parallel = False
+    executor = None
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', simulate = 'False', parallel = 'False',
+                 workers = '0', splitGhosts = 'False'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        self.simulate = str(simulate) == 'True'
+        self.parallel = str(parallel) == 'True'
+        self.workers = int(workers) or os.cpu_count() or 1
+        self.splitGhosts = str(splitGhosts) == 'True'
+
+    def searchState(self, gameState):
+        "The state to search from: gameState, or its SimulationState with simulate=True"
+        if self.simulate:
+            return SimulationState.fromGameState(gameState)
+        return gameState
+
+    def getExecutor(self):
+        "The process pool for parallel search, started on first use"
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+    def rootValues(self, gameState, method, combine):
+        """
+        The values of Pacman's legal moves from gameState, each subtree
+        searched by self.<method> in the pool.  With splitGhosts, the first
+        ghost's replies are jobs of their own and combine (min, or the mean
+        for expectimax) turns their values into the move's.
+        """
+        numAgents = gameState.getNumAgents()
+        legalMoves = gameState.getLegalActions(self.index)
+        nextIndex = (self.index + 1) % numAgents
+        jobs = [] # (move, state, depth, agentIndex)
+        for move, action in enumerate(legalMoves):
+            state = gameState.generateSuccessor(self.index, action)
+            if self.splitGhosts and nextIndex != 0 and not (state.isWin() or state.isLose()):
+                ghostNext = (nextIndex + 1) % numAgents
+                depth = self.depth - 1 if ghostNext == 0 else self.depth
+                for ghostAction in state.getLegalActions(nextIndex):
+                    jobs.append((move, state.generateSuccessor(nextIndex, ghostAction), depth, ghostNext))
+            else:
+                jobs.append((move, state, self.depth, nextIndex))
+
+        executor = self.getExecutor()
+        futures = [executor.submit(searchInWorker, self, method, state, depth, agentIndex)
+                   for move, state, depth, agentIndex in jobs]
+        values = [[] for action in legalMoves]
+        for (move, state, depth, agentIndex), future in zip(jobs, futures):
+            values[move].append(future.result())
+        return legalMoves, [combine(moveValues) for moveValues in values]
+
+    def __getstate__(self):
+        # The pool stays with the process that started it
+        state = self.__dict__.copy()
+        state.pop('executor', None)
+        state.pop('sharedAlpha', None)
+        return state
+
+    def final(self, state):
+        "Shuts down the process pool, if there is one, at the end of a game"
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+# The parent's best root value so far in a parallel AlphaBetaAgent search,
+# set in each pool process by initSearchWorker
+_sharedAlpha = None
+
+def initSearchWorker(sharedAlpha):
+    global _sharedAlpha
+    _sharedAlpha = sharedAlpha
+
+def searchInWorker(agent, method, gameState, depth, agentIndex):
+    "Searches one subtree with agent.<method> in a pool process"
+    return getattr(agent, method)(gameState, depth, agentIndex)
+
+def searchYoungerBrother(agent, gameState, depth, agentIndex, alpha):
+    """
+    AlphaBetaAgent.alphaBeta on one of the root's younger brothers in a pool
+    process.  Before each of the first ghost's moves, alpha is raised to the
+    best root value the parent has shared, so a move that can no longer be
+    the best is cut off early.
+    """
+    if agentIndex == 0 or gameState.isWin() or gameState.isLose() or depth == 0:
+        return agent.alphaBeta(gameState, depth, agentIndex, alpha, float('inf'))
+    nextIndex = (agentIndex + 1) % gameState.getNumAgents()
+    d2 = (depth - 1) if nextIndex == 0 else depth
+    minScore = float('inf')
+    for action in gameState.getLegalActions(agentIndex):
+        alpha = max(alpha, _sharedAlpha.value)
+        state = gameState.generateSuccessor(agentIndex, action)
+        minScore = min(minScore, agent.alphaBeta(state, d2, nextIndex, alpha, minScore))
+        if minScore < alpha:
+            return minScore
+    return minScore
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -144,10 +252,14 @@ class MinimaxAgent(MultiAgentSearchAgent):
         Returns whether or not the game state is a losing state
         """
         "*** YOUR CODE HERE ***"
-        # Collect legal moves and successor states
-        legalMoves = gameState.getLegalActions(self.index)
-        successors = [gameState.generateSuccessor(self.index, action) for action in legalMoves]
-        scores = [self.minimax(nextState, self.depth, (self.index + 1) % gameState.getNumAgents()) for nextState in successors]
+        gameState = self.searchState(gameState)
+        if self.parallel:
+            legalMoves, scores = self.rootValues(gameState, 'minimax', min)
+        else:
+            # Collect legal moves and successor states
+            legalMoves = gameState.getLegalActions(self.index)
+            successors = [gameState.generateSuccessor(self.index, action) for action in legalMoves]
+            scores = [self.minimax(nextState, self.depth, (self.index + 1) % gameState.getNumAgents()) for nextState in successors]
 
         # Choose one of the best actions
         #scores = [self.evaluationFunction(gameState, action) for action in legalMoves]
@@ -185,11 +297,49 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         Returns the minimax action using self.depth and self.evaluationFunction
         """
         "*** YOUR CODE HERE ***"
+        gameState = self.searchState(gameState)
+        if self.parallel:
+            return self.parallelAlphaBeta(gameState)
         # Collect legal moves and successor states
         score = self.alphaBeta(gameState, self.depth, self.index, float('-inf'), float('inf'))
 
         return score
 
+    def getExecutor(self):
+        "The process pool, each worker set up by initSearchWorker to read sharedAlpha"
+        if self.executor is None:
+            self.sharedAlpha = multiprocessing.RawValue('d', float('-inf'))
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, initializer=initSearchWorker, initargs=(self.sharedAlpha,))
+        return self.executor
+
+    def parallelAlphaBeta(self, gameState):
+        """
+        Young brothers wait: the first move is searched here for a bound, then
+        the rest go to the pool together with it.  As each comes back, a
+        better bound is shared with the workers still searching (see
+        searchYoungerBrother).  Plays the same move as alphaBeta.
+        """
+        legalMoves = gameState.getLegalActions(self.index)
+        nextIndex = (self.index + 1) % gameState.getNumAgents()
+        d2 = (self.depth - 1) if nextIndex == 0 else self.depth
+        successors = [gameState.generateSuccessor(self.index, action) for action in legalMoves]
+
+        scores = [self.alphaBeta(successors[0], d2, nextIndex, float('-inf'), float('inf'))]
+        if len(successors) > 1:
+            executor = self.getExecutor()
+            self.sharedAlpha.value = scores[0]
+            futures = {executor.submit(searchYoungerBrother, self, state, d2, nextIndex, scores[0]): i
+                       for i, state in enumerate(successors[1:], 1)}
+            scores += [None] * len(futures)
+            for future in concurrent.futures.as_completed(futures):
+                score = future.result()
+                scores[futures[future]] = score
+                if score > self.sharedAlpha.value:
+                    self.sharedAlpha.value = score
+        # A cut off move's score is below the best, so the first best is alphaBeta's move
+        return legalMoves[scores.index(max(scores))]
+
     def alphaBeta(self, gameState, depth, agentIndex, alpha, beta):
         if gameState.isWin() or gameState.isLose() or (depth == 0):
             return self.evaluationFunction(gameState)
@@ -227,6 +377,149 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
             return minScore
             
 
+# Transposition table bounds: the stored value is exact, or a lower or upper
+# bound because the search that produced it was cut off.
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class TranspositionTable:
+    """
+    A fixed number of slots indexed by Zobrist key.  Each slot holds one
+    (key, depth, bound, value, move, generation) entry.  A colliding store
+    replaces the old entry if it is from an earlier getAction() or was
+    searched no deeper than the new one.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+
+    def newSearch(self):
+        self.generation += 1
+
+    def lookup(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, bound, value, move):
+        slot = key % self.size
+        entry = self.slots[slot]
+        if entry is None or entry[0] == key or entry[5] != self.generation or entry[1] <= depth:
+            self.slots[slot] = (key, depth, bound, value, move, self.generation)
+
+class _OutOfTime(Exception):
+    pass
+
+class IterativeAlphaBetaAgent(AlphaBetaAgent):
+    """
+    Alpha-beta search with iterative deepening and a transposition table.
+
+    Searches depth 1, 2, ... up to depth until timeBudget seconds have gone
+    by, and plays the best move of the last depth it finished.  Positions
+    are keyed with Zobrist hashing, so a state reached again by a different
+    move order reuses the earlier result; the keys start from the one each
+    GameStateData maintains as it is built, so hashing a node is O(1).  The best move stored for a
+    position (the previous iteration's principal variation) is tried first.
+
+    The budget should stay below the game's move timeout (--timeout).  Use
+    it with, e.g., -p IterativeAlphaBetaAgent -a timeBudget=0.5,depth=8
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '100', timeBudget = '1.0', tableSize = '1048576'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth)
+        self.timeBudget = float(timeBudget)
+        self.keys = zobristKeys
+        self.table = TranspositionTable(int(tableSize))
+        self.searchedDepth = 0
+
+    def getAction(self, gameState):
+        """
+        Returns the best move of the deepest search finished within the budget
+        """
+        self.table.newSearch()
+        self.deadline = time.time() + self.timeBudget
+        self.nodes = 0
+
+        bestMove = None
+        for depth in range(1, self.depth + 1):
+            # The first iteration always finishes, so there is a move to play
+            self.mustFinish = depth == 1
+            try:
+                value, move = self.search(gameState, depth, self.index, float('-inf'), float('inf'))
+            except _OutOfTime:
+                break
+            bestMove = move
+            self.searchedDepth = depth
+        return bestMove
+
+    def positionKey(self, gameState, agentIndex):
+        """
+        Zobrist key of a state: the state's own key (agents, food and capsules)
+        plus the score and side to move.  Pacman's facing doesn't change his
+        options, so it is taken back out; a ghost's does (ghosts can't reverse).
+        """
+        keys = self.keys
+        return gameState.data.zobristKey() ^ keys['turn', agentIndex] ^ keys['score', gameState.getScore()] ^ \
+            keys['direction', 0, gameState.data.agentStates[0].configuration.direction]
+
+    def search(self, gameState, depth, agentIndex, alpha, beta):
+        """
+        Fail-soft alpha-beta; returns (value, best move) for agentIndex to move
+        """
+        self.nodes += 1
+        if self.nodes & 255 == 0 and not self.mustFinish and time.time() > self.deadline:
+            raise _OutOfTime()
+        if gameState.isWin() or gameState.isLose() or (depth == 0):
+            return self.evaluationFunction(gameState), None
+
+        key = self.positionKey(gameState, agentIndex)
+        entry = self.table.lookup(key)
+        pvMove = None
+        if entry is not None:
+            _, entryDepth, bound, value, pvMove, _ = entry
+            if entryDepth >= depth:
+                if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+                    return value, pvMove
+
+        nextIndex = (agentIndex + 1) % gameState.getNumAgents()
+        d2 = (depth - 1) if nextIndex == 0 else depth
+        legalMoves = gameState.getLegalActions(agentIndex)
+        if pvMove in legalMoves:
+            legalMoves.remove(pvMove)
+            legalMoves.insert(0, pvMove)
+
+        alphaOriginal, betaOriginal = alpha, beta
+        bestMove = None
+        if agentIndex == 0:
+            bestScore = float('-inf')
+        else:
+            bestScore = float('inf')
+        for action in legalMoves:
+            state = gameState.generateSuccessor(agentIndex, action)
+            score, _ = self.search(state, d2, nextIndex, alpha, beta)
+
+            if agentIndex == 0:
+                if score > bestScore:
+                    bestScore, bestMove = score, action
+                alpha = max(alpha, bestScore)
+            else:
+                if score < bestScore:
+                    bestScore, bestMove = score, action
+                beta = min(beta, bestScore)
+            if alpha >= beta:
+                break
+
+        if bestScore <= alphaOriginal:
+            bound = UPPER
+        elif bestScore >= betaOriginal:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, bound, bestScore, bestMove)
+        return bestScore, bestMove
+
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
@@ -240,10 +533,14 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         legal moves.
         """
         "*** YOUR CODE HERE ***"
-        # Collect legal moves and successor states
-        legalMoves = gameState.getLegalActions(self.index)
-        successors = [gameState.generateSuccessor(self.index, action) for action in legalMoves]
-        scores = [self.expectimax(nextState, self.depth, (self.index + 1) % gameState.getNumAgents()) for nextState in successors]
+        gameState = self.searchState(gameState)
+        if self.parallel:
+            legalMoves, scores = self.rootValues(gameState, 'expectimax', lambda values: sum(values)/len(values))
+        else:
+            # Collect legal moves and successor states
+            legalMoves = gameState.getLegalActions(self.index)
+            successors = [gameState.generateSuccessor(self.index, action) for action in legalMoves]
+            scores = [self.expectimax(nextState, self.depth, (self.index + 1) % gameState.getNumAgents()) for nextState in successors]
 
         # Choose one of the best actions
         #scores = [self.evaluationFunction(gameState, action) for action in legalMoves]
@@ -269,6 +566,346 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
             return max(scores)
         return sum(scores)/len(scores)
 
+class SampledExpectimaxAgent(ExpectimaxAgent):
+    """
+    Expectimax that estimates chance nodes rather than enumerating them.
+
+    samples=k averages the values of k ghost moves drawn at random (without
+    replacement) at each chance node, or of all of them when there are no
+    more than k; samples=0 enumerates every move, as ExpectimaxAgent does.
+    With jointGhosts=True the ghosts move together in one chance node: each
+    sample draws a move for every ghost in turn, so a ply costs k nodes
+    instead of k ** ghosts (all the combinations are tried if there are no
+    more than k).  cacheSize bounds a memo of node values keyed by
+    (state, depth, agent), which is kept from one move to the next.  The
+    random draws come from seed, when one is given.
+
+    > python pacman.py -p SampledExpectimaxAgent -a depth=3,samples=3,jointGhosts=True
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', simulate = 'False', samples = '4',
+                 jointGhosts = 'False', cacheSize = '100000', seed = None):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, simulate)
+        self.samples = int(samples)
+        self.jointGhosts = str(jointGhosts) == 'True'
+        self.cacheSize = int(cacheSize)
+        self.cache = collections.OrderedDict()
+        self.random = random.Random(None if seed is None else int(seed))
+
+    def getAction(self, gameState):
+        """
+        Returns the action with the best estimated value
+        """
+        gameState = self.searchState(gameState)
+        legalMoves = gameState.getLegalActions(self.index)
+        scores = [self.childValue(gameState.generateSuccessor(self.index, action), self.depth, self.index)
+                  for action in legalMoves]
+
+        bestScore = max(scores)
+        bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore]
+        return legalMoves[self.random.choice(bestIndices)]
+
+    def childValue(self, gameState, depth, agentIndex):
+        "Value of the state after agentIndex moved; the ply ends once every agent has"
+        nextIndex = (agentIndex + 1) % gameState.getNumAgents()
+        return self.value(gameState, (depth - 1) if nextIndex == 0 else depth, nextIndex)
+
+    def value(self, gameState, depth, agentIndex):
+        "Value of a node, from the memo when it is there"
+        if gameState.isWin() or gameState.isLose() or (depth == 0):
+            return self.evaluationFunction(gameState)
+        if self.cacheSize <= 0:
+            return self.nodeValue(gameState, depth, agentIndex)
+
+        key = (gameState, depth, agentIndex)
+        value = self.cache.get(key)
+        if value is not None:
+            self.cache.move_to_end(key)
+            return value
+        value = self.nodeValue(gameState, depth, agentIndex)
+        self.cache[key] = value
+        if len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+        return value
+
+    def nodeValue(self, gameState, depth, agentIndex):
+        if agentIndex == 0:
+            return max(self.childValue(gameState.generateSuccessor(0, action), depth, 0)
+                       for action in gameState.getLegalActions(0))
+        if self.jointGhosts:
+            return self.jointValue(gameState, depth, agentIndex)
+
+        legalMoves = gameState.getLegalActions(agentIndex)
+        if 0 < self.samples < len(legalMoves):
+            legalMoves = self.random.sample(legalMoves, self.samples)
+        scores = [self.childValue(gameState.generateSuccessor(agentIndex, action), depth, agentIndex)
+                  for action in legalMoves]
+        return sum(scores) / len(scores)
+
+    def jointValue(self, gameState, depth, ghostIndex):
+        """
+        Expected value over the moves of ghostIndex and every ghost after it,
+        which all happen in this one chance node
+        """
+        if gameState.isWin() or gameState.isLose() or ghostIndex == gameState.getNumAgents():
+            return self.value(gameState, depth - 1, 0)
+
+        if self.samples > 0 and ghostIndex == 1 and self.jointOutcomes(gameState) > self.samples:
+            # Draw every ghost's move at once, samples times
+            total = 0.0
+            for _ in range(self.samples):
+                state = gameState
+                for index in range(1, gameState.getNumAgents()):
+                    if state.isWin() or state.isLose():
+                        break
+                    state = state.generateSuccessor(index, self.random.choice(state.getLegalActions(index)))
+                total += self.value(state, depth - 1, 0)
+            return total / self.samples
+
+        legalMoves = gameState.getLegalActions(ghostIndex)
+        scores = [self.jointValue(gameState.generateSuccessor(ghostIndex, action), depth, ghostIndex + 1)
+                  for action in legalMoves]
+        return sum(scores) / len(scores)
+
+    def jointOutcomes(self, gameState):
+        "How many combinations of ghost moves there are from gameState"
+        outcomes = 1
+        for ghostIndex in range(1, gameState.getNumAgents()):
+            outcomes *= len(gameState.getLegalActions(ghostIndex))
+        return outcomes
+
+class MCTSNode:
+    """
+    A node of the Monte Carlo search tree: a state, whose agentIndex is to
+    move, with visit and value totals from Pacman's point of view and the
+    range of the values backed up through it.
+    """
+
+    def __init__(self, state, agentIndex, parent=None, action=None):
+        self.state = state
+        self.agentIndex = agentIndex
+        self.parent = parent
+        self.action = action
+        self.children = {}
+        self.untried = state.getLegalActions(agentIndex)
+        self.visits = 0
+        self.scored = 0
+        self.total = 0.0
+        self.lowValue, self.highValue = float('inf'), float('-inf')
+
+def mctsRollout(state, agentIndex, evaluationFunction, moves, policy, seed):
+    """
+    Plays up to moves single-agent moves from state, with agentIndex to move
+    first, and returns the evaluation of where that ends.  Ghosts move at
+    random; Pacman does too with policy 'random', and with 'greedy' he
+    mostly takes the move the evaluation function likes best.
+    """
+    rand = random.Random(seed)
+    numAgents = state.getNumAgents()
+    for _ in range(moves):
+        if state.isWin() or state.isLose():
+            break
+        legal = state.getLegalActions(agentIndex)
+        if agentIndex == 0 and policy == 'greedy' and rand.random() > 0.1:
+            scores = [evaluationFunction(state.generateSuccessor(0, action)) for action in legal]
+            action = legal[scores.index(max(scores))]
+        else:
+            action = rand.choice(legal)
+        state = state.generateSuccessor(agentIndex, action)
+        agentIndex = (agentIndex + 1) % numAgents
+    return evaluationFunction(state)
+
+def mctsRollouts(jobs):
+    "mctsRollout for each argument tuple in jobs: one pool task's worth of rollouts"
+    return [mctsRollout(*job) for job in jobs]
+
+class MonteCarloTreeSearchAgent(MultiAgentSearchAgent):
+    """
+    UCT (Monte Carlo tree search with UCB1 selection) that thinks for a fixed
+    wall-clock time per move.
+
+    timeBudget is the seconds spent per move, but never more than
+    timeoutFraction of the game's move timeout (ClassicGameRules.getMoveTimeout,
+    passed in through setMoveTimeout).  Each iteration walks down the tree,
+    adds a node, and scores it with a rollout of depth plies (see
+    mctsRollout; rollout is 'greedy' or 'random') ending in evalFn.  Ghost
+    nodes pick moves at random (ghostModel='random') or, with 'adversarial',
+    by UCB against Pacman.  The move played is the most visited one, and
+    the subtree under it is kept for the next move if the ghosts did one of
+    the things it expected.
+
+    pool='thread' or 'process' runs rollouts in a concurrent.futures pool of
+    workers threads or processes (all the cores by default, as for the other
+    agents' parallel=True).  Each round picks batchSize leaves per worker,
+    with a virtual loss so that they spread out, and hands each worker its
+    batchSize rollouts as one task, so a process pool pickles states in
+    bulk rather than one at a time.  A round is not started if the last one
+    would not fit in the time left.  Search runs on a SimulationState unless
+    simulate=False.
+
+    > python pacman.py -p MonteCarloTreeSearchAgent -a timeBudget=0.2 -l mediumClassic
+    """
+
+    def __init__(self, evalFn = 'betterEvaluationFunction', depth = '10', simulate = 'True', timeBudget = '0.5',
+                 timeoutFraction = '0.8', exploration = '1.4', rollout = 'greedy', ghostModel = 'random',
+                 pool = 'none', workers = '0', batchSize = '4', seed = None):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, simulate, workers=workers)
+        self.timeBudget = float(timeBudget)
+        self.timeoutFraction = float(timeoutFraction)
+        self.moveTimeout = None
+        self.exploration = float(exploration)
+        if rollout not in ['greedy', 'random']:
+            raise Exception('Unknown rollout policy: ' + rollout)
+        if ghostModel not in ['random', 'adversarial']:
+            raise Exception('Unknown ghost model: ' + ghostModel)
+        if pool not in ['none', 'thread', 'process']:
+            raise Exception('Unknown pool type: ' + pool)
+        self.rollout = rollout
+        self.ghostModel = ghostModel
+        self.pool = pool
+        self.batchSize = int(batchSize)
+        self.roundSize = self.workers * self.batchSize if pool != 'none' else 1
+        self.random = random.Random(None if seed is None else int(seed))
+        self.root = None
+        self.iterations = 0
+
+    def setMoveTimeout(self, timeout):
+        "Called by Game with rules.getMoveTimeout(index) before the game starts"
+        self.moveTimeout = timeout
+
+    def getBudget(self):
+        if self.moveTimeout is None:
+            return self.timeBudget
+        return min(self.timeBudget, self.timeoutFraction * self.moveTimeout)
+
+    def getAction(self, gameState):
+        """
+        Returns the most visited root move after searching for the time budget
+        """
+        deadline = time.time() + self.getBudget()
+        state = self.searchState(gameState)
+        self.root = self.reuseSubtree(state)
+        self.iterations = 0
+
+        while True:
+            start = time.time()
+            batch = [self.select(self.root) for _ in range(self.roundSize)]
+            values = self.rolloutValues(batch)
+            for leaf, value in zip(batch, values):
+                self.backpropagate(leaf, value)
+            self.iterations += len(batch)
+            now = time.time()
+            if now + (now - start) > deadline or not self.root.untried and not self.root.children:
+                break
+
+        children = list(self.root.children.values())
+        if not children:
+            return Directions.STOP
+        mostVisits = max(child.visits for child in children)
+        best = [child for child in children if child.visits == mostVisits]
+        chosen = self.random.choice(best)
+        self.root = chosen
+        return chosen.action
+
+    def reuseSubtree(self, state):
+        """
+        Finds state among the descendants of the node played last time that
+        are reached by ghost moves alone; otherwise starts a new tree.
+        """
+        frontier = [self.root] if self.root is not None else []
+        while frontier:
+            nextFrontier = []
+            for node in frontier:
+                if node.agentIndex == 0:
+                    if node.state == state:
+                        node.parent = None
+                        return node
+                else:
+                    nextFrontier.extend(node.children.values())
+            frontier = nextFrontier
+        return MCTSNode(state, 0)
+
+    def select(self, node):
+        """
+        Walks down from node to a leaf, adding a child for a move not tried
+        yet when it gets to one.  Counts a visit on every node it passes
+        before there is a value for it, which shrinks the exploration bonus
+        of paths already in a batch (a virtual loss) so the batch spreads out.
+        """
+        while True:
+            node.visits += 1
+            state = node.state
+            if state.isWin() or state.isLose():
+                return node
+            if node.agentIndex != 0 and self.ghostModel == 'random':
+                action = self.random.choice(state.getLegalActions(node.agentIndex))
+                if action in node.children:
+                    node = node.children[action]
+                    continue
+            elif node.untried:
+                action = node.untried[self.random.randrange(len(node.untried))]
+            else:
+                node = self.bestChild(node)
+                continue
+            node.untried.remove(action)
+            nextIndex = (node.agentIndex + 1) % state.getNumAgents()
+            child = MCTSNode(state.generateSuccessor(node.agentIndex, action), nextIndex, node, action)
+            node.children[action] = child
+            child.visits += 1
+            return child
+
+    def bestChild(self, node):
+        "The child with the highest UCB1 score for the agent to move at node"
+        logVisits = math.log(node.visits)
+        # UCB1 wants values in [0, 1]: scale by the range the current root has
+        # seen, which a reused subtree brings along and a new one starts empty
+        lowValue = self.root.lowValue
+        scale = max(self.root.highValue - lowValue, 1e-9)
+        best, bestScore = None, float('-inf')
+        for child in node.children.values():
+            if child.scored == 0:
+                mean = 0.5
+            else:
+                mean = (child.total / child.scored - lowValue) / scale
+                if node.agentIndex != 0:
+                    mean = 1 - mean
+            score = mean + self.exploration * math.sqrt(logVisits / child.visits)
+            if score > bestScore:
+                best, bestScore = child, score
+        return best
+
+    def rolloutValues(self, leaves):
+        "Rollout values for a batch of leaves, run in the pool if there is one"
+        moves = self.depth * (leaves[0].state.getNumAgents())
+        jobs = [(leaf.state, leaf.agentIndex, self.evaluationFunction, moves, self.rollout, self.random.getrandbits(32))
+                for leaf in leaves]
+        if self.pool == 'none':
+            return mctsRollouts(jobs)
+        if self.pool == 'thread':
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+            executor = self.executor
+        else:
+            executor = self.getExecutor()
+        tasks = [jobs[i:i + self.batchSize] for i in range(0, len(jobs), self.batchSize)]
+        return [value for values in executor.map(mctsRollouts, tasks) for value in values]
+
+    def backpropagate(self, node, value):
+        "Adds value to every node from node up to the root (visits were counted by select)"
+        while node is not None:
+            node.scored += 1
+            node.total += value
+            if value < node.lowValue:
+                node.lowValue = value
+            if value > node.highValue:
+                node.highValue = value
+            node = node.parent
+
+    def final(self, state):
+        "Drops the tree and shuts down the pool at the end of a game"
+        self.root = None
+        MultiAgentSearchAgent.final(self, state)
+
 def betterEvaluationFunction(currentGameState):
     """
     Your extreme ghost-hunting, pellet-nabbing, food-gobbling, unstoppable
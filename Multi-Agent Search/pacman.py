@@ -43,6 +43,7 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
 import util
@@ -77,8 +78,13 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # Instrumentation of generateSuccessor, off by default: recording explored
+    # states hashes two whole GameStates per successor and keeps every one of
+    # them alive.  See setInstrumentation.
+    instrumentation = None
+    expanded = 0
     explored = set()
+    exploredLimit = None
 
     def getAndResetExplored():
         tmp = GameState.explored.copy()
@@ -86,6 +92,27 @@ class GameState:
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def getAndResetExpanded():
+        tmp = GameState.expanded
+        GameState.expanded = 0
+        return tmp
+    getAndResetExpanded = staticmethod(getAndResetExpanded)
+
+    def setInstrumentation(mode=None, exploredLimit=None):
+        """
+        mode is None (record nothing), 'count' (count generateSuccessor calls in
+        GameState.expanded) or 'explored' (count them and also add parent and
+        successor to GameState.explored).  With an exploredLimit, explored
+        stops growing once it holds that many states.
+        """
+        if mode not in INSTRUMENTATION_MODES:
+            raise Exception('Unknown instrumentation mode: ' + str(mode))
+        GameState.instrumentation = mode
+        GameState.exploredLimit = exploredLimit
+        GameState.expanded = 0
+        GameState.explored = set()
+    setInstrumentation = staticmethod(setInstrumentation)
+
     def getLegalActions(self, agentIndex=0):
         """
         Returns the legal actions for the agent specified.
@@ -121,7 +148,8 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY  # Penalty for waiting around
         else:
-            GhostRules.decrementTimer(state.data.agentStates[agentIndex])
+            GhostRules.decrementTimer(state.data.mutableAgentState(agentIndex))
+            state.data.updateAgentKey(agentIndex)
 
         # Resolve multi-agent effects
         GhostRules.checkDeath(state, agentIndex)
@@ -129,8 +157,12 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.instrumentation is not None:
+            GameState.expanded += 1
+            if GameState.instrumentation == 'explored' and \
+                    (GameState.exploredLimit is None or len(GameState.explored) < GameState.exploredLimit):
+                GameState.explored.add(self)
+                GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions(self):
@@ -272,6 +304,7 @@ class GameState:
 SCARED_TIME = 40    # Moves ghosts are scared
 COLLISION_TOLERANCE = 0.7  # How close ghosts must be to Pacman to kill
 TIME_PENALTY = 1  # Number of points lost each round
+INSTRUMENTATION_MODES = [None, 'count', 'explored']  # See GameState.setInstrumentation
 
 
 class ClassicGameRules:
@@ -359,12 +392,13 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.mutableAgentState(0)
 
         # Update Configuration
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
         pacmanState.configuration = pacmanState.configuration.generateSuccessor(
             vector)
+        state.data.updateAgentKey(0)
 
         # Eat
         next = pacmanState.configuration.getPosition()
@@ -381,6 +415,7 @@ class PacmanRules:
             state.data.scoreChange += 10
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
+            state.data.updateFoodKey(position)
             state.data._foodEaten = position
             # TODO: cache numFood?
             numFood = state.getNumFood()
@@ -389,11 +424,13 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if(position in state.getCapsules()):
-            state.data.capsules.remove(position)
+            state.data.capsules = [capsule for capsule in state.data.capsules if capsule != position]
             state.data._capsuleEaten = position
+            state.data.updateCapsuleKey(position)
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.mutableAgentState(index).scaredTimer = SCARED_TIME
+                state.data.updateAgentKey(index)
     consume = staticmethod(consume)
 
 
@@ -425,20 +462,22 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.mutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0:
             speed /= 2.0
         vector = Actions.directionToVector(action, speed)
         ghostState.configuration = ghostState.configuration.generateSuccessor(
             vector)
+        state.data.updateAgentKey(ghostIndex)
     applyAction = staticmethod(applyAction)
 
     def decrementTimer(ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint(
-                ghostState.configuration.pos)
+            # Replace the Configuration rather than editing it: it may be shared with earlier states
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration(nearestPoint(configuration.pos), configuration.direction)
         ghostState.scaredTimer = max(0, timer - 1)
     decrementTimer = staticmethod(decrementTimer)
 
@@ -449,12 +488,12 @@ class GhostRules:
                 ghostState = state.data.agentStates[index]
                 ghostPosition = ghostState.configuration.getPosition()
                 if GhostRules.canKill(pacmanPosition, ghostPosition):
-                    GhostRules.collide(state, ghostState, index)
+                    GhostRules.collide(state, state.data.mutableAgentState(index), index)
         else:
             ghostState = state.data.agentStates[agentIndex]
             ghostPosition = ghostState.configuration.getPosition()
             if GhostRules.canKill(pacmanPosition, ghostPosition):
-                GhostRules.collide(state, ghostState, agentIndex)
+                GhostRules.collide(state, state.data.mutableAgentState(agentIndex), agentIndex)
     checkDeath = staticmethod(checkDeath)
 
     def collide(state, ghostState, agentIndex):
@@ -462,7 +501,9 @@ class GhostRules:
             state.data.scoreChange += 200
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
+            state.data.updateAgentKey(agentIndex)
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -554,6 +595,13 @@ def readCommand(argv):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--workers', dest='workers', type='int',
+                      help=default('Number of processes to play non-training games in (no graphics when > 1)'), default=1)
+    parser.add_option('--instrument', dest='instrumentation', type='choice',
+                      choices=['none', 'count', 'explored'], default='none',
+                      help=default('Record generated successors: none, count, or explored (also keeps the states)'))
+    parser.add_option('--exploredLimit', dest='exploredLimit', type='int', default=None,
+                      help='Most states to keep when instrumenting with explored')
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -564,6 +612,9 @@ def readCommand(argv):
     if options.fixRandomSeed:
         random.seed('cs188')
 
+    if options.instrumentation != 'none':
+        GameState.setInstrumentation(options.instrumentation, options.exploredLimit)
+
     # Choose a layout
     args['layout'] = layout.getLayout(options.layout)
     if args['layout'] == None:
@@ -606,6 +657,7 @@ def readCommand(argv):
     args['record'] = options.record
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    args['workers'] = options.workers
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
@@ -672,14 +724,18 @@ def replayGame(layout, actions, display):
     display.finish()
 
 
-def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30):
+def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30, workers=1):
     import __main__
     __main__.__dict__['_display'] = display
 
     rules = ClassicGameRules(timeout)
     games = []
 
-    for i in range(numGames):
+    # With several workers only the training games are played here; the rest
+    # go to runParallelGames with a snapshot of the trained agents
+    numSequential = numGames if workers <= 1 else min(numGames, numTraining)
+
+    for i in range(numSequential):
         beQuiet = i < numTraining
         if beQuiet:
                 # Suppress output and graphics
@@ -696,14 +752,11 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
             games.append(game)
 
         if record:
-            import time
-            import pickle
-            fname = ('recorded-game-%d' % (i + 1)) + \
-                '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = file(fname, 'w')
-            components = {'layout': layout, 'actions': game.moveHistory}
-            pickle.dump(components, f)
-            f.close()
+            recordGame(i, layout, game.moveHistory)
+
+    if numSequential < numGames:
+        games += runParallelGames(layout, pacman, ghosts, range(numSequential, numGames),
+                                  record, catchExceptions, timeout, workers)
 
     if (numGames-numTraining) > 0:
         scores = [game.state.getScore() for game in games]
@@ -715,10 +768,86 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
               (wins.count(True), len(wins), winRate))
         print('Record:       ', ', '.join(
             [['Loss', 'Win'][int(w)] for w in wins]))
+    if GameState.instrumentation is not None:
+        print('Successors:    %d generated' % GameState.expanded)
 
     return games
 
 
+def recordGame(gameIndex, layout, moveHistory):
+    import time
+    import pickle
+    fname = ('recorded-game-%d' % (gameIndex + 1)) + \
+        '-'.join([str(t) for t in time.localtime()[1:6]])
+    f = open(fname, 'wb')
+    components = {'layout': layout, 'actions': moveHistory}
+    pickle.dump(components, f)
+    f.close()
+
+
+class FinishedGame:
+    """
+    What a worker process sends back for one game: the final GameState and
+    the move history, plus the crash/timeout flags of the Game.  It has the
+    attributes callers of runGames read from a Game.
+    """
+
+    def __init__(self, game):
+        self.state = game.state
+        self.moveHistory = game.moveHistory
+        self.agentCrashed = game.agentCrashed
+        self.agentTimeout = game.agentTimeout
+        self.expanded = GameState.expanded
+
+
+def playGameInWorker(gameIndex, seed, layout, pacman, ghosts, catchExceptions, timeout, instrumentation=(None, None)):
+    """
+    Plays one game without graphics in a worker process.  The agents are the
+    unpickled snapshot sent with this game, so nothing they learn here
+    reaches the parent or other games.  instrumentation is the parent's
+    (mode, exploredLimit); only the successor count is sent back.
+    """
+    import textDisplay
+    random.seed(seed)
+    GameState.setInstrumentation(*instrumentation)
+    rules = ClassicGameRules(timeout)
+    game = rules.newGame(layout, pacman, ghosts,
+                         textDisplay.NullGraphics(), True, catchExceptions)
+    game.run()
+    return gameIndex, FinishedGame(game)
+
+
+def runParallelGames(layout, pacman, ghosts, gameIndices, record, catchExceptions, timeout, workers):
+    """
+    Plays the given games across a pool of worker processes and returns
+    their FinishedGames in game order, printing each result as it comes in.
+
+    Every game gets its own seed drawn from the parent's random module, so
+    --fixRandomSeed makes a parallel run repeatable regardless of which worker
+    picks up which game.
+    """
+    import concurrent.futures
+    gameIndices = list(gameIndices)
+    seeds = [random.getrandbits(32) for i in gameIndices]
+    instrumentation = (GameState.instrumentation, GameState.exploredLimit)
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(playGameInWorker, i, seed, layout, pacman, ghosts, catchExceptions, timeout,
+                                   instrumentation)
+                   for i, seed in zip(gameIndices, seeds)]
+        for future in concurrent.futures.as_completed(futures):
+            i, game = future.result()
+            results[i] = game
+            GameState.expanded += game.expanded
+            print('Game %d: %s, score %d (%d/%d done)' %
+                  (i + 1, ['Loss', 'Win'][int(game.state.isWin())], game.state.getScore(),
+                   len(results), len(gameIndices)))
+            sys.stdout.flush()
+            if record:
+                recordGame(i, layout, game.moveHistory)
+    return [results[i] for i in gameIndices]
+
+
 if __name__ == '__main__':
     """
     The main function called when pacman.py is run
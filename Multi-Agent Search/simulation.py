@@ -0,0 +1,346 @@
+# simulation.py
+# -------------
+
+
+"""
+A compact stand-in for pacman.GameState for tree search.
+
+A SimulationState keeps only what the classic rules read: agent positions
+as ints, agent directions, scared timers, the food as the bits of a BitGrid,
+the remaining capsules as a bit mask, and the score.  SimulationRules plays
+PacmanRules and GhostRules on it, move for move, so the successors (and
+their scores, wins and losses) match what the real game would produce.
+
+SimulationState.fromGameState converts a GameState once, at the root of a
+search; after that, getLegalActions and generateSuccessor never touch the
+layout, display bookkeeping or Configuration objects.  The usual accessors
+(getPacmanPosition, getFood, getGhostStates, getScore, ...) are there too,
+so evaluation functions written for GameStates work unchanged.  (The
+GameState instrumentation in pacman.py does not count these successors.)
+
+> python pacman.py -p AlphaBetaAgent -a depth=3,simulate=True
+"""
+
+from game import Directions
+from game import Actions
+from game import Configuration
+from game import AgentState
+from game import BitGrid
+from pacman import SCARED_TIME, TIME_PENALTY
+
+# Direction indices: a state stores DIRECTIONS.index(direction) for each agent
+DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+DIRECTION_INDEX = dict((direction, i) for i, direction in enumerate(DIRECTIONS))
+STOP = DIRECTION_INDEX[Directions.STOP]
+REVERSE = [DIRECTION_INDEX[Actions.reverseDirection(direction)] for direction in DIRECTIONS]
+
+
+class SimulationLayout:
+    """
+    The parts of a game that no move changes, precomputed for one walls
+    Grid, set of agent starts and set of capsules.
+
+    Positions are encoded in half steps, since scared ghosts move at half
+    speed: (x, y) becomes 2x * stride + 2y with stride = 2 * height, so a
+    move in direction d adds steps * deltas[d], with steps 2 at full speed
+    and 1 at half speed.
+    """
+
+    def __init__(self, walls, starts, capsules):
+        self.walls = walls
+        self.width, self.height = walls.width, walls.height
+        self.stride = 2 * walls.height
+        self.deltas = [1, -1, self.stride, -self.stride, 0]
+        self.starts = [self.encode(position) for position in starts]
+        self.capsules = list(capsules)
+        self.capsuleBits = dict((self.encode(position), 1 << i) for i, position in enumerate(self.capsules))
+
+        # Legal actions from each cell (x * height + y), in the order Actions gives them
+        self.pacmanActions = []
+        self.ghostActions = []
+        for x in range(self.width):
+            for y in range(self.height):
+                if walls[x][y]:
+                    actions = []
+                else:
+                    actions = Actions.getPossibleActions(Configuration((x, y), Directions.STOP), walls)
+                self.pacmanActions.append(actions)
+                self.ghostActions.append([action for action in actions if action != Directions.STOP])
+
+    def encode(self, position):
+        x, y = position
+        return int(round(2 * x)) * self.stride + int(round(2 * y))
+
+    def decode(self, encoded):
+        "The (x, y) position of an encoded one: ints on grid points, floats between them"
+        x2, y2 = divmod(encoded, self.stride)
+        x = x2 // 2 if x2 % 2 == 0 else x2 / 2.0
+        y = y2 // 2 if y2 % 2 == 0 else y2 / 2.0
+        return (x, y)
+
+    def cell(self, encoded):
+        "Index of the grid point an encoded position is on (the food bit there)"
+        x2, y2 = divmod(encoded, self.stride)
+        return (x2 // 2) * self.height + y2 // 2
+
+    def onGridPoint(self, encoded):
+        x2, y2 = divmod(encoded, self.stride)
+        return x2 % 2 == 0 and y2 % 2 == 0
+
+_layouts = {}
+
+def getSimulationLayout(walls, starts, capsules):
+    "Returns a shared SimulationLayout, building it on first use"
+    key = (id(walls), tuple(starts), tuple(capsules))
+    layout = _layouts.get(key)
+    if layout is None or layout.walls is not walls:
+        if len(_layouts) > 16:
+            _layouts.clear()
+        layout = _layouts[key] = SimulationLayout(walls, starts, capsules)
+    return layout
+
+
+class SimulationState:
+    """
+    A game state for search; see the module docstring.  Treat it as
+    immutable: generateSuccessor returns a new one.
+    """
+    __slots__ = ('layout', 'positions', 'directions', 'scaredTimers', 'food', 'numFood',
+                 'capsules', 'score', 'win', 'lose')
+
+    def fromGameState(gameState):
+        "Converts a pacman.GameState"
+        data = gameState.data
+        agentStates = data.agentStates
+        layout = getSimulationLayout(gameState.getWalls(), [agentState.start.pos for agentState in agentStates],
+                                     gameState.getCapsules())
+        state = SimulationState()
+        state.layout = layout
+        state.positions = [layout.encode(agentState.configuration.pos) for agentState in agentStates]
+        state.directions = [DIRECTION_INDEX[agentState.configuration.direction] for agentState in agentStates]
+        state.scaredTimers = [agentState.scaredTimer for agentState in agentStates]
+        food = gameState.getFood()
+        state.food = food.bits if isinstance(food, BitGrid) else BitGrid.fromGrid(food).bits
+        state.numFood = food.count()
+        state.capsules = (1 << len(layout.capsules)) - 1
+        state.score = data.score
+        state.win = gameState.isWin()
+        state.lose = gameState.isLose()
+        return state
+    fromGameState = staticmethod(fromGameState)
+
+    def copy(self):
+        state = SimulationState()
+        state.layout = self.layout
+        state.positions = self.positions[:]
+        state.directions = self.directions[:]
+        state.scaredTimers = self.scaredTimers[:]
+        state.food = self.food
+        state.numFood = self.numFood
+        state.capsules = self.capsules
+        state.score = self.score
+        state.win = self.win
+        state.lose = self.lose
+        return state
+
+    def getLegalActions(self, agentIndex=0):
+        if self.win or self.lose:
+            return []
+        if agentIndex == 0:
+            return SimulationRules.getPacmanActions(self)
+        return SimulationRules.getGhostActions(self, agentIndex)
+
+    def generateSuccessor(self, agentIndex, action):
+        if self.win or self.lose:
+            raise Exception('Can\'t generate a successor of a terminal state.')
+        state = self.copy()
+        if agentIndex == 0:
+            scoreChange = SimulationRules.applyPacmanAction(state, action) - TIME_PENALTY
+        else:
+            scoreChange = SimulationRules.applyGhostAction(state, action, agentIndex)
+        state.score += scoreChange + SimulationRules.checkDeath(state, agentIndex)
+        return state
+
+    def getLegalPacmanActions(self):
+        return self.getLegalActions(0)
+
+    def generatePacmanSuccessor(self, action):
+        return self.generateSuccessor(0, action)
+
+    def getAgentState(self, agentIndex):
+        "Builds a game.AgentState for an agent, for code that wants one"
+        layout = self.layout
+        agentState = AgentState(Configuration(layout.decode(layout.starts[agentIndex]), Directions.STOP), agentIndex == 0)
+        agentState.configuration = Configuration(layout.decode(self.positions[agentIndex]),
+                                                 DIRECTIONS[self.directions[agentIndex]])
+        agentState.scaredTimer = self.scaredTimers[agentIndex]
+        return agentState
+
+    def getPacmanState(self):
+        return self.getAgentState(0)
+
+    def getPacmanPosition(self):
+        return self.layout.decode(self.positions[0])
+
+    def getGhostStates(self):
+        return [self.getAgentState(index) for index in range(1, len(self.positions))]
+
+    def getGhostState(self, agentIndex):
+        if agentIndex == 0 or agentIndex >= self.getNumAgents():
+            raise Exception("Invalid index passed to getGhostState")
+        return self.getAgentState(agentIndex)
+
+    def getGhostPosition(self, agentIndex):
+        if agentIndex == 0:
+            raise Exception("Pacman's index passed to getGhostPosition")
+        return self.layout.decode(self.positions[agentIndex])
+
+    def getGhostPositions(self):
+        return [self.layout.decode(position) for position in self.positions[1:]]
+
+    def getNumAgents(self):
+        return len(self.positions)
+
+    def getScore(self):
+        return float(self.score)
+
+    def getCapsules(self):
+        return [position for i, position in enumerate(self.layout.capsules) if self.capsules & (1 << i)]
+
+    def getNumFood(self):
+        return self.numFood
+
+    def getFood(self):
+        food = BitGrid(self.layout.width, self.layout.height)
+        food.bits = self.food
+        return food
+
+    def getWalls(self):
+        return self.layout.walls
+
+    def hasFood(self, x, y):
+        return (self.food >> (x * self.layout.height + y)) & 1 == 1
+
+    def hasWall(self, x, y):
+        return self.layout.walls[x][y]
+
+    def isWin(self):
+        return self.win
+
+    def isLose(self):
+        return self.lose
+
+    def _key(self):
+        return (tuple(self.positions), tuple(self.directions), tuple(self.scaredTimers),
+                self.food, self.capsules, self.score)
+
+    def __eq__(self, other):
+        return isinstance(other, SimulationState) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+
+class SimulationRules:
+    """
+    PacmanRules and GhostRules for SimulationStates.  The apply functions
+    edit a fresh copy in place and return the score change they cause.
+    """
+
+    def getPacmanActions(state):
+        return state.layout.pacmanActions[state.layout.cell(state.positions[0])][:]
+    getPacmanActions = staticmethod(getPacmanActions)
+
+    def getGhostActions(state, ghostIndex):
+        """
+        Ghosts cannot stop, and cannot turn around unless they reach a dead
+        end.  Between grid points (when scared) they carry straight on.
+        """
+        layout = state.layout
+        position = state.positions[ghostIndex]
+        direction = state.directions[ghostIndex]
+        if not layout.onGridPoint(position):
+            return [DIRECTIONS[direction]]
+        possibleActions = layout.ghostActions[layout.cell(position)][:]
+        reverse = DIRECTIONS[REVERSE[direction]]
+        if reverse in possibleActions and len(possibleActions) > 1:
+            possibleActions.remove(reverse)
+        return possibleActions
+    getGhostActions = staticmethod(getGhostActions)
+
+    def applyPacmanAction(state, action):
+        if action not in SimulationRules.getPacmanActions(state):
+            raise Exception("Illegal action " + str(action))
+        layout = state.layout
+        direction = DIRECTION_INDEX[action]
+        position = state.positions[0] + 2 * layout.deltas[direction]
+        state.positions[0] = position
+        if direction != STOP:
+            state.directions[0] = direction
+
+        # Eat
+        scoreChange = 0
+        bit = 1 << layout.cell(position)
+        if state.food & bit:
+            scoreChange += 10
+            state.food ^= bit
+            state.numFood -= 1
+            if state.numFood == 0:
+                scoreChange += 500
+                state.win = True
+        capsuleBit = layout.capsuleBits.get(position, 0)
+        if state.capsules & capsuleBit:
+            state.capsules ^= capsuleBit
+            for index in range(1, len(state.scaredTimers)):
+                state.scaredTimers[index] = SCARED_TIME
+        return scoreChange
+    applyPacmanAction = staticmethod(applyPacmanAction)
+
+    def applyGhostAction(state, action, ghostIndex):
+        if action not in SimulationRules.getGhostActions(state, ghostIndex):
+            raise Exception("Illegal ghost action " + str(action))
+        layout = state.layout
+        direction = DIRECTION_INDEX[action]
+        timer = state.scaredTimers[ghostIndex]
+        steps = 1 if timer > 0 else 2
+        position = state.positions[ghostIndex] + steps * layout.deltas[direction]
+        if direction != STOP:
+            state.directions[ghostIndex] = direction
+
+        # Time passes: a ghost that stops being scared snaps to the nearest grid point
+        if timer == 1:
+            x2, y2 = divmod(position, layout.stride)
+            position = (x2 + x2 % 2) * layout.stride + y2 + y2 % 2
+        state.scaredTimers[ghostIndex] = max(0, timer - 1)
+        state.positions[ghostIndex] = position
+        return 0
+    applyGhostAction = staticmethod(applyGhostAction)
+
+    def checkDeath(state, agentIndex):
+        "Resolves collisions after agentIndex moved; returns the score change"
+        if agentIndex == 0:
+            ghosts = range(1, len(state.positions))
+        else:
+            ghosts = [agentIndex]
+        scoreChange = 0
+        stride = state.layout.stride
+        pacmanX, pacmanY = divmod(state.positions[0], stride)
+        for index in ghosts:
+            ghostX, ghostY = divmod(state.positions[index], stride)
+            # COLLISION_TOLERANCE (0.7) in half steps
+            if abs(ghostX - pacmanX) + abs(ghostY - pacmanY) <= 1:
+                scoreChange += SimulationRules.collide(state, index)
+        return scoreChange
+    checkDeath = staticmethod(checkDeath)
+
+    def collide(state, ghostIndex):
+        if state.scaredTimers[ghostIndex] > 0:
+            state.positions[ghostIndex] = state.layout.starts[ghostIndex]
+            state.directions[ghostIndex] = STOP
+            state.scaredTimers[ghostIndex] = 0
+            return 200
+        if not state.win:
+            state.lose = True
+            return -500
+        return 0
+    collide = staticmethod(collide)
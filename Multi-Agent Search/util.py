@@ -31,6 +31,7 @@ import inspect
 import heapq
 import random
 import io
+import collections
 
 
 class FixedRandom:
@@ -152,28 +153,38 @@ class Stack:
         "Returns true if the stack is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
 
     def __init__(self):
-        self.list = []
+        self.list = collections.deque()
 
     def push(self, item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0, item)
+        self.list.append(item)
+
+    def extend(self, items):
+        "Enqueue every item in 'items', in order"
+        self.list.extend(items)
 
     def pop(self):
         """
         Dequeue the earliest enqueued item still in the queue. This
         operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        return len(self.list)
+
 
 class PriorityQueue:
     """
@@ -196,9 +207,17 @@ class PriorityQueue:
         (_, _, item) = heapq.heappop(self.heap)
         return item
 
+    def peek(self):
+        "Returns (item, priority) of the lowest-priority item without removing it"
+        (priority, _, item) = self.heap[0]
+        return item, priority
+
     def isEmpty(self):
         return len(self.heap) == 0
 
+    def __len__(self):
+        return len(self.heap)
+
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
         # If item already in priority queue with equal or lower priority, do nothing.
@@ -233,6 +252,144 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedPriorityQueue:
+    """
+    A priority queue that keeps an item -> heap position map, so each item
+    appears at most once and can be found, re-prioritized or removed in
+    O(log n) instead of the linear scan done by PriorityQueue.update.  Items
+    must be hashable.  It has the same push/pop/isEmpty/update signature as
+    PriorityQueue and can be dropped in wherever items are not pushed twice.
+
+    With lazy=True, update and remove leave the old heap entry in place and
+    mark it dead; pop skips dead entries.  That trades memory for doing no
+    sifting at all on removal, which pays off when most updates are removals.
+    """
+
+    def __init__(self, lazy=False):
+        self.heap = []
+        self.index = {}
+        self.count = 0
+        self.lazy = lazy
+
+    def push(self, item, priority):
+        "Adds item with the given priority, replacing its priority if present"
+        if item in self.index:
+            self.remove(item)
+        entry = [priority, self.count, item]
+        self.count += 1
+        if self.lazy:
+            self.index[item] = entry
+            heapq.heappush(self.heap, entry)
+        else:
+            self.index[item] = len(self.heap)
+            self.heap.append(entry)
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Removes and returns the item with the lowest priority"
+        if self.lazy:
+            while self.heap:
+                entry = heapq.heappop(self.heap)
+                if self.index.get(entry[2]) is entry:
+                    del self.index[entry[2]]
+                    return entry[2]
+            raise IndexError('pop from an empty priority queue')
+        item = self.heap[0][2]
+        self._removeAt(0)
+        return item
+
+    def peek(self):
+        "Returns (item, priority) of the lowest-priority item without removing it"
+        if self.lazy:
+            while self.heap and self.index.get(self.heap[0][2]) is not self.heap[0]:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                raise IndexError('peek at an empty priority queue')
+        (priority, _, item) = self.heap[0]
+        return item, priority
+
+    def isEmpty(self):
+        return len(self.index) == 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def contains(self, item):
+        "Returns true if item is currently in the queue"
+        return item in self.index
+
+    __contains__ = contains
+
+    def getPriority(self, item):
+        "Returns the priority of an item in the queue"
+        if self.lazy:
+            return self.index[item][0]
+        return self.heap[self.index[item]][0]
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of an item
+        # already in the queue, leave it alone if the new priority is not
+        # lower, and push it if it isn't queued at all.
+        if item not in self.index:
+            self.push(item, priority)
+        elif priority < self.getPriority(item):
+            if self.lazy:
+                self.push(item, priority)
+            else:
+                position = self.index[item]
+                self.heap[position][0] = priority
+                self._siftUp(position)
+
+    def remove(self, item):
+        "Removes an item from the queue"
+        if self.lazy:
+            # The stale heap entry is skipped when it reaches the top
+            del self.index[item]
+        else:
+            self._removeAt(self.index[item])
+
+    def _removeAt(self, position):
+        heap = self.heap
+        del self.index[heap[position][2]]
+        last = heap.pop()
+        if position < len(heap):
+            heap[position] = last
+            self.index[last[2]] = position
+            self._siftDown(position)
+            self._siftUp(position)
+
+    def _siftUp(self, position):
+        heap, index = self.heap, self.index
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[position] = heap[parent]
+            index[heap[position][2]] = position
+            position = parent
+        heap[position] = entry
+        index[entry[2]] = position
+
+    def _siftDown(self, position):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[position] = heap[child]
+            index[heap[position][2]] = position
+            position = child
+        heap[position] = entry
+        index[entry[2]] = position
+
+
 def manhattanDistance(xy1, xy2):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
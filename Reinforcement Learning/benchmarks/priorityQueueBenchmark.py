@@ -0,0 +1,95 @@
+# priorityQueueBenchmark.py
+# -------------------------
+
+
+"""
+Micro-benchmark for the priority queues in util.py on update-heavy workloads,
+the access pattern of PrioritizedSweepingValueIterationAgent.
+
+Each workload pushes n items, then performs a mix of update() calls (most of
+them lowering a priority) and pop() calls, then drains the queue.
+
+> python benchmarks/priorityQueueBenchmark.py -n 2000 -u 20000
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import util
+
+
+def makeWorkload(numItems, numUpdates, popEvery, seed):
+    """
+    Returns a list of operations: ('push', item, priority), ('update', item,
+    priority) or ('pop',).  Updates only target items that haven't been popped
+    yet (every update lowers a priority, so each pop takes the live item with
+    the lowest one), so none of them pushes a popped item back in.
+    """
+    rand = random.Random(seed)
+    priorities = dict((item, rand.random()) for item in range(numItems))
+    ops = [('push', item, priority) for item, priority in priorities.items()]
+    live = list(priorities)
+    for i in range(numUpdates):
+        if popEvery and i % popEvery == popEvery - 1 and live:
+            ops.append(('pop',))
+            popped = min(live, key=priorities.get)
+            live.remove(popped)
+            continue
+        if not live:
+            break
+        item = rand.choice(live)
+        priorities[item] -= rand.random()
+        ops.append(('update', item, priorities[item]))
+    ops.extend([('pop',)] * numItems)
+    return ops
+
+
+def run(queue, ops):
+    "Replays ops against queue; returns (seconds, popped items)"
+    popped = []
+    start = time.perf_counter()
+    for op in ops:
+        if op[0] == 'push':
+            queue.push(op[1], op[2])
+        elif op[0] == 'update':
+            queue.update(op[1], op[2])
+        elif not queue.isEmpty():
+            popped.append(queue.pop())
+    return time.perf_counter() - start, popped
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/priorityQueueBenchmark.py <options>')
+    parser.add_option('-n', '--numItems', type='int', dest='numItems', default=2000,
+                      help='Number of distinct items in the queue [Default: %default]')
+    parser.add_option('-u', '--numUpdates', type='int', dest='numUpdates', default=20000,
+                      help='Number of update/pop operations [Default: %default]')
+    parser.add_option('-p', '--popEvery', type='int', dest='popEvery', default=10,
+                      help='Pop once every this many operations, 0 for never [Default: %default]')
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    options, _ = parser.parse_args(argv)
+
+    ops = makeWorkload(options.numItems, options.numUpdates, options.popEvery, options.seed)
+    queues = [('PriorityQueue', util.PriorityQueue),
+              ('IndexedPriorityQueue', util.IndexedPriorityQueue),
+              ('IndexedPriorityQueue(lazy)', lambda: util.IndexedPriorityQueue(lazy=True))]
+
+    print('%d items, %d update/pop operations' % (options.numItems, options.numUpdates))
+    baseline, reference = None, None
+    for name, queueType in queues:
+        seconds, popped = run(queueType(), ops)
+        if reference is None:
+            baseline, reference = seconds, popped
+        elif popped != reference:
+            print('%s popped items in a different order than PriorityQueue!' % name)
+        print('%-28s %9.4fs  %8.0f ops/s  %6.1fx' %
+              (name, seconds, len(ops) / seconds, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
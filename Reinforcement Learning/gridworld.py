@@ -514,6 +514,8 @@ if __name__ == '__main__':
         a = valueIterationAgents.AsynchronousValueIterationAgent(mdp, opts.discount, opts.iters)
     elif opts.agent == 'priosweepvalue':
         a = valueIterationAgents.PrioritizedSweepingValueIterationAgent(mdp, opts.discount, opts.iters)
+    elif opts.agent == 'compiledvalue':
+        a = valueIterationAgents.CompiledValueIterationAgent(mdp, opts.discount, opts.iters)
     else:
         if not opts.manual: raise Exception('Unknown agent type: '+opts.agent)
 
@@ -523,7 +525,7 @@ if __name__ == '__main__':
     ###########################
     # DISPLAY Q/V VALUES BEFORE SIMULATION OF EPISODES
     try:
-        if not opts.manual and opts.agent in ('value', 'asynchvalue', 'priosweepvalue'):
+        if not opts.manual and opts.agent in ('value', 'asynchvalue', 'priosweepvalue', 'compiledvalue'):
             if opts.valueSteps:
                 for i in range(opts.iters):
                     tempAgent = valueIterationAgents.ValueIterationAgent(mdp, opts.discount, i)
@@ -545,7 +547,7 @@ if __name__ == '__main__':
         if opts.manual and opts.agent == None:
             displayCallback = lambda state: display.displayNullValues(state)
         else:
-            if opts.agent in ('random', 'value', 'asynchvalue', 'priosweepvalue'):
+            if opts.agent in ('random', 'value', 'asynchvalue', 'priosweepvalue', 'compiledvalue'):
                 displayCallback = lambda state: display.displayValues(a, state, "CURRENT VALUES")
             if opts.agent == 'q': displayCallback = lambda state: display.displayQValues(a, state, "CURRENT Q-VALUES")
 
@@ -31,6 +31,12 @@ import mdp, util
 from learningAgents import ValueEstimationAgent
 import collections
 
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
 class ValueIterationAgent(ValueEstimationAgent):
     """
         * Please read learningAgents.py before reading this.*
@@ -127,6 +133,92 @@ class ValueIterationAgent(ValueEstimationAgent):
     def getQValue(self, state, action):
         return self.computeQValueFromValues(state, action)
 
+class CompiledMDP:
+    """
+        A MarkovDecisionProcess flattened into NumPy arrays, so that a
+        Bellman backup over every state is a handful of vector operations
+        instead of Python calls per state, action and successor.
+
+        Every (state, action) pair of a non-terminal state gets a row, and
+        the transition model is stored sparsely as one entry per
+        (row, nextState) with its probability and reward.  Rows belonging to
+        the same state are contiguous, starting at rowStarts.
+    """
+    def __init__(self, mdp):
+        if not _NUMPY_ENABLED:
+            raise Exception('CompiledMDP needs numpy, which could not be imported')
+
+        self.states = mdp.getStates()
+        self.stateIndex = dict((state, i) for i, state in enumerate(self.states))
+
+        rowStates = []
+        rows, nextStates, probs, rewards = [], [], [], []
+        for i, state in enumerate(self.states):
+            if mdp.isTerminal(state):
+                continue
+            for action in mdp.getPossibleActions(state):
+                row = len(rowStates)
+                rowStates.append(i)
+                for nextState, prob in mdp.getTransitionStatesAndProbs(state, action):
+                    rows.append(row)
+                    nextStates.append(self.stateIndex[nextState])
+                    probs.append(prob)
+                    rewards.append(mdp.getReward(state, action, nextState))
+
+        self.numRows = len(rowStates)
+        self.rowStates = numpy.array(rowStates, dtype=numpy.int64)
+        self.rows = numpy.array(rows, dtype=numpy.int64)
+        self.nextStates = numpy.array(nextStates, dtype=numpy.int64)
+        self.probs = numpy.array(probs, dtype=float)
+        self.rewards = numpy.array(rewards, dtype=float)
+
+        # States with at least one action, and the first row of each
+        starts = numpy.flatnonzero(numpy.diff(self.rowStates, prepend=-1))
+        self.actingStates = self.rowStates[starts]
+        self.rowStarts = starts
+
+    def qValues(self, values, discount):
+        """
+          Returns the Q-value of every (state, action) row given an array of
+          state values.
+        """
+        backups = self.probs * (self.rewards + discount * values[self.nextStates])
+        return numpy.bincount(self.rows, weights=backups, minlength=self.numRows)
+
+    def bellmanBackup(self, values, discount):
+        """
+          Returns the values after one synchronous round of value iteration.
+          States without actions (including terminal ones) keep their value.
+        """
+        newValues = values.copy()
+        if self.numRows > 0:
+            newValues[self.actingStates] = numpy.maximum.reduceat(self.qValues(values, discount), self.rowStarts)
+        return newValues
+
+class CompiledValueIterationAgent(ValueIterationAgent):
+    """
+        * Please read learningAgents.py before reading this.*
+
+        A CompiledValueIterationAgent runs the same batch value iteration as
+        ValueIterationAgent, but compiles the mdp into a CompiledMDP once and
+        does each round as array operations.  Iteration stops early once no
+        value changes by more than tolerance.  Needs numpy.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, tolerance = 0.0):
+        self.tolerance = tolerance
+        ValueIterationAgent.__init__(self, mdp, discount, iterations)
+
+    def runValueIteration(self):
+        self.compiled = CompiledMDP(self.mdp)
+        values = numpy.zeros(len(self.compiled.states))
+        for i in range(self.iterations):
+            newValues = self.compiled.bellmanBackup(values, self.discount)
+            change = numpy.abs(newValues - values).max() if len(values) else 0.0
+            values = newValues
+            if change <= self.tolerance:
+                break
+        self.values = util.Counter(zip(self.compiled.states, values.tolist()))
+
 class AsynchronousValueIterationAgent(ValueIterationAgent):
     """
         * Please read learningAgents.py before reading this.*
@@ -182,7 +274,7 @@ class PrioritizedSweepingValueIterationAgent(AsynchronousValueIterationAgent):
         ValueIterationAgent.__init__(self, mdp, discount, iterations)
 
     def runValueIteration(self):
-        priorityQueue = util.PriorityQueue()
+        priorityQueue = util.IndexedPriorityQueue()
 
         states = self.mdp.getStates()
         predecessors = {}
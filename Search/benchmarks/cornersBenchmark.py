@@ -0,0 +1,79 @@
+# cornersBenchmark.py
+# -------------------
+
+
+"""
+CornersProblem expansion throughput on generated bigCorners-sized mazes (a
+dot in each corner), comparing the tuple states CornersProblem used to have
+with the current int-encoded ones.
+
+> python benchmarks/cornersBenchmark.py --sizes 37,75
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import search
+import searchAgents
+import mazes
+from game import Actions, Directions
+
+
+class TupleCornersProblem(searchAgents.CornersProblem):
+    "The previous CornersProblem: states are ((visited flags), position)."
+    def __init__(self, startingGameState):
+        searchAgents.CornersProblem.__init__(self, startingGameState)
+        flags = tuple(corner == self.startingPosition for corner in self.corners)
+        self.startState = (flags, self.startingPosition)
+
+    def isGoalState(self, state):
+        return (list(state[0]) == [True, True, True, True])
+
+    def getSuccessors(self, state):
+        successors = []
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x,y = state[1]
+            dx, dy = Actions.directionToVector(action)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                t = list(state[0]).copy()
+                flags = [corner == (nextx, nexty) for corner in self.corners]
+                successors.append(((tuple([a or b for a, b in zip(flags, t)]), (nextx, nexty)), action, 1))
+        self._expanded += 1
+        return successors
+
+
+def timeSearch(gameState, problemType, searchFunction):
+    "Returns (expanded, path cost, seconds) for one search of a fresh problem"
+    problem = problemType(gameState)
+    start = time.perf_counter()
+    actions = searchFunction(problem)
+    seconds = time.perf_counter() - start
+    return problem._expanded, problem.getCostOfActions(actions), seconds
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/cornersBenchmark.py <options>')
+    parser.add_option('--sizes', dest='sizes', default='37,75',
+                      help='Comma separated maze side lengths [Default: %default]')
+    parser.add_option('--loops', dest='loops', type='float', default=0.1,
+                      help='Fraction of interior walls removed [Default: %default]')
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    options, _ = parser.parse_args(argv)
+
+    print('%7s %6s %9s %6s %15s %13s %8s' % ('size', 'search', 'expanded', 'cost', 'tuple nodes/s', 'int nodes/s', 'speedup'))
+    for size in [int(s) for s in options.sizes.split(',')]:
+        gameState = mazes.generateGameState(size, size, options.seed, options.loops, 'corners')
+        for name, searchFunction in (('bfs', search.bfs), ('ucs', search.ucs)):
+            expanded, cost, before = timeSearch(gameState, TupleCornersProblem, searchFunction)
+            _, _, after = timeSearch(gameState, searchAgents.CornersProblem, searchFunction)
+            print('%7s %6s %9d %6d %15.0f %13.0f %7.1fx' %
+                  ('%dx%d' % (size, size), name, expanded, cost, expanded / before, expanded / after, before / after))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
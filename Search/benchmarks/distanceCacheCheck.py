@@ -0,0 +1,71 @@
+# distanceCacheCheck.py
+# ---------------------
+
+
+"""
+Checks the on-disk tables of MazeDistanceOracle: a SearchAgent run with
+distanceCache=<dir> writes the table for its layout there, and an oracle
+built afterwards on the same walls memory-maps that file back instead of
+running the BFS, with the same distances as a fresh computation and as
+search.bfs.  Reports the time to build a table against the time to load it.
+
+> python benchmarks/distanceCacheCheck.py --size 61 --food 0.003
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import search
+import searchAgents
+import mazes
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/distanceCacheCheck.py <options>')
+    parser.add_option('--size', type='int', dest='size', default=41)
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=0)
+    parser.add_option('--food', type='float', dest='food', default=0.006,
+                      help='Fraction of cells with a dot for the A* run [Default: %default]')
+    options, _ = parser.parse_args(argv)
+
+    gameState = mazes.generateGameState(options.size, options.size, options.seed, 0.1, options.food)
+    walls = gameState.getWalls()
+    cacheDir = tempfile.mkdtemp(prefix='distanceCache')
+    try:
+        agent = searchAgents.SearchAgent('astar', 'FoodSearchProblem', 'foodHeuristic', distanceCache=cacheDir)
+        agent.registerInitialState(gameState)
+        tables = os.listdir(cacheDir)
+        if len(tables) != 1:
+            raise Exception('Expected one distance table in %s, found %s' % (cacheDir, tables))
+
+        start = time.perf_counter()
+        computed = searchAgents.MazeDistanceOracle(walls)
+        buildTime = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = searchAgents.MazeDistanceOracle(walls, cacheDir)
+        loadTime = time.perf_counter() - start
+        if not isinstance(loaded.distances, memoryview):
+            raise Exception('The table in %s was computed again rather than loaded' % cacheDir)
+        if list(loaded.distances) != list(computed.distances):
+            raise Exception('The table loaded from %s differs from a fresh one' % cacheDir)
+
+        cells = computed.cells
+        for i in range(0, len(cells), max(1, len(cells) // 20)):
+            problem = searchAgents.PositionSearchProblem(gameState, start=cells[0], goal=cells[i], warn=False, visualize=False)
+            if loaded.getDistance(cells[0], cells[i]) != len(search.bfs(problem)):
+                raise Exception('Loaded distance from %s to %s differs from bfs' % (cells[0], cells[i]))
+        print('%d cells: table computed in %.3fs, loaded from %s in %.4fs' %
+              (len(cells), buildTime, tables[0], loadTime))
+    finally:
+        searchAgents.setDistanceCacheDir(None)
+        shutil.rmtree(cacheDir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
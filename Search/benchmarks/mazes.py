@@ -0,0 +1,88 @@
+# mazes.py
+# --------
+
+
+"""
+Generated layouts for the benchmarks in this directory.  Mazes are carved with
+a randomized depth-first search over a lattice of cells, then a fraction of
+the remaining interior walls is knocked out so that there are loops (like the
+classic layouts) rather than a perfect tree.
+
+The mazes are read by the BoardLayout of Multi-Agent Search/benchmarks/boards.py
+rather than layout.Layout, and importing boards stands in for layout.py
+when it is missing, so the benchmarks run without it.
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Multi-Agent Search', 'benchmarks'))
+
+from boards import BoardLayout
+import pacman
+
+
+def generateMazeText(width, height, seed=0, loopFraction=0.05, food='goal'):
+    """
+    Returns the rows of a layout file, top row first, for a width x height
+    maze (both rounded down to odd numbers).  Pacman starts in the top right
+    cell of a 'goal' maze and in the middle of the board otherwise.
+
+    food is 'goal' for a single dot in the bottom left corner (a regular
+    search maze), 'corners' for a dot in each corner, or a float giving the
+    fraction of open cells that get a dot.
+    """
+    rand = random.Random(seed)
+    width, height = width - (width + 1) % 2, height - (height + 1) % 2
+    rows = [['%'] * width for y in range(height)]
+    cellsWide, cellsHigh = (width - 1) // 2, (height - 1) // 2
+
+    stack = [(0, 0)]
+    seen = set(stack)
+    rows[1][1] = ' '
+    while stack:
+        cx, cy = stack[-1]
+        neighbors = [(cx + dx, cy + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                     if 0 <= cx + dx < cellsWide and 0 <= cy + dy < cellsHigh
+                     and (cx + dx, cy + dy) not in seen]
+        if not neighbors:
+            stack.pop()
+            continue
+        nx, ny = rand.choice(neighbors)
+        seen.add((nx, ny))
+        rows[2 * ny + 1][2 * nx + 1] = ' '
+        rows[cy + ny + 1][cx + nx + 1] = ' '
+        stack.append((nx, ny))
+
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            if rows[y][x] == '%' and rand.random() < loopFraction:
+                rows[y][x] = ' '
+
+    # Rows are built top down, so (1, 1) on the board is rows[height - 2][1]
+    top, right = 1, width - 2
+    bottom, left = height - 2, 1
+    openCells = [(x, y) for y in range(height) for x in range(width) if rows[y][x] == ' ']
+    if food == 'goal':
+        rows[bottom][left] = '.'
+    elif food == 'corners':
+        for x, y in ((left, top), (left, bottom), (right, top), (right, bottom)):
+            rows[y][x] = '.'
+    else:
+        for x, y in rand.sample(openCells, max(1, int(len(openCells) * food))):
+            rows[y][x] = '.'
+    if food == 'goal':
+        rows[top][right] = 'P'
+    else:
+        rows[2 * (cellsHigh // 2) + 1][2 * (cellsWide // 2) + 1] = 'P'
+    return [''.join(row) for row in rows]
+
+
+def generateGameState(width, height, seed=0, loopFraction=0.05, food='goal'):
+    "Returns a pacman.GameState (with no ghosts) for a generated maze"
+    mazeLayout = BoardLayout(generateMazeText(width, height, seed, loopFraction, food))
+    state = pacman.GameState()
+    state.initialize(mazeLayout, 0)
+    return state
@@ -0,0 +1,241 @@
+# searchBenchmark.py
+# ------------------
+
+
+"""
+Runs the search functions and heuristics over generated mazes of increasing
+size and records, for each run, the nodes expanded and generated, the wall
+time, the peak resident set size and the cost of the path found.  Results
+can be saved as a baseline and later runs compared against it, so a change
+that makes a search slower, hungrier or worse shows up as a regression.
+
+> python benchmarks/searchBenchmark.py --save benchmarks/baseline.json
+> python benchmarks/searchBenchmark.py --compare benchmarks/baseline.json
+
+Each run happens in a fresh worker process (where the platform has fork and
+the resource module), so the peak RSS belongs to that run alone.  With
+--compare the script exits with status 1 if anything regressed.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    import resource
+    _RESOURCE_ENABLED = True
+except:
+    _RESOURCE_ENABLED = False
+
+import search
+import searchAgents
+import mazes
+
+# (name, problem type, search function, heuristic) for every benchmarked search
+CASES = [
+    ('dfs', 'PositionSearchProblem', 'dfs', None),
+    ('bfs', 'PositionSearchProblem', 'bfs', None),
+    ('ucs', 'PositionSearchProblem', 'ucs', None),
+    ('astar-manhattan', 'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('astar-euclidean', 'PositionSearchProblem', 'astar', 'euclideanHeuristic'),
+    ('biastar-manhattan', 'PositionSearchProblem', 'biastar', 'manhattanHeuristic'),
+    ('jps-manhattan', 'PositionSearchProblem', 'jps', 'manhattanHeuristic'),
+    ('corridor-astar', 'CorridorSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('corners-bfs', 'CornersProblem', 'bfs', None),
+    ('corners-astar', 'CornersProblem', 'astar', 'cornersHeuristic'),
+    ('corridor-corners-astar', 'CorridorCornersProblem', 'astar', 'cornersHeuristic'),
+    ('food-astar', 'FoodSearchProblem', 'astar', 'foodHeuristic'),
+    ('food-astar-mst', 'FoodSearchProblem', 'astar', 'mstFoodHeuristic'),
+]
+
+# Problems that take PositionSearchProblem's keyword arguments and a single-dot maze
+POSITION_PROBLEMS = ['PositionSearchProblem', 'CorridorSearchProblem']
+
+
+def makeProblem(problemType, gameState):
+    problemClass = getattr(searchAgents, problemType)
+    if problemType in POSITION_PROBLEMS:
+        return problemClass(gameState, warn=False, visualize=False)
+    return problemClass(gameState)
+
+
+def peakRss():
+    "Peak resident set size of this process in KB, or None without the resource module"
+    if not _RESOURCE_ENABLED:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024 # macOS reports bytes rather than KB
+    return peak
+
+
+def runCase(job):
+    """
+    Runs one (case, size, seed, loops, repeat) job and returns its result
+    dict.  The wall time is the best of repeat runs; the other figures come
+    from the last one.
+    """
+    (name, problemType, fn, heuristic), size, seed, loops, repeat = job
+    food = 'goal' if problemType in POSITION_PROBLEMS else 'corners'
+    gameState = mazes.generateGameState(size, size, seed, loops, food)
+    func = getattr(search, fn)
+    heur = getattr(searchAgents, heuristic) if heuristic else None
+
+    best = None
+    for _ in range(repeat):
+        problem = makeProblem(problemType, gameState)
+        instrumented = search.InstrumentedProblem(problem)
+        start = time.perf_counter()
+        if heur is None:
+            actions = func(instrumented)
+        else:
+            actions = func(instrumented, heuristic=heur)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    if 'expandActions' in dir(problem):
+        actions = problem.expandActions(actions)
+
+    stats = instrumented.searchStats
+    return {'case': name, 'size': size, 'expanded': stats.expanded, 'generated': stats.generated,
+            'seconds': best, 'peakRssKb': peakRss(), 'cost': problem.getCostOfActions(actions)}
+
+
+def runBenchmarks(cases, sizes, seed, loops, repeat, isolate=True):
+    "Returns a dict of result dicts keyed by resultKey"
+    jobs = [(case, size, seed, loops, repeat) for size in sizes for case in cases]
+    results = {}
+    if isolate and _RESOURCE_ENABLED and 'fork' in multiprocessing.get_all_start_methods():
+        # A fresh process per job, so ru_maxrss is that job's own peak
+        pool = multiprocessing.get_context('fork').Pool(1, maxtasksperchild=1)
+        try:
+            for result in pool.imap(runCase, jobs):
+                results[resultKey(result)] = result
+                printResult(result)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for job in jobs:
+            result = runCase(job)
+            results[resultKey(result)] = result
+            printResult(result)
+    return results
+
+
+def resultKey(result):
+    return '%s@%d' % (result['case'], result['size'])
+
+
+def formatRss(kb):
+    return '-' if kb is None else '%.1fM' % (kb / 1024.0)
+
+
+def printResult(result):
+    print('%-24s %5d %10d %10d %9.4f %9s %12.6g' %
+          (result['case'], result['size'], result['expanded'], result['generated'],
+           result['seconds'], formatRss(result['peakRssKb']), result['cost']))
+    sys.stdout.flush()
+
+
+def saveBaseline(path, results, options):
+    baseline = {'python': platform.python_version(), 'machine': platform.machine(),
+                'seed': options.seed, 'loops': options.loops, 'repeat': options.repeat,
+                'results': results}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print('Saved %d results to %s' % (len(results), path))
+
+
+def compareResults(baseline, results, timeTolerance, rssTolerance):
+    """
+    Prints each result next to its baseline and returns the number of
+    regressions: a different path cost, more nodes expanded, or a time or
+    peak RSS more than the given tolerance (a ratio) above the baseline's.
+    """
+    print('\n%-24s %5s %18s %22s %18s %14s  %s' %
+          ('case', 'size', 'expanded', 'seconds', 'peak rss', 'cost', 'status'))
+    regressions = 0
+    for key in sorted(results, key=lambda k: (results[k]['size'], k)):
+        new, old = results[key], baseline.get(key)
+        if old is None:
+            print('%-24s %5d %18d %22.4f %18s %14.6g  new' %
+                  (new['case'], new['size'], new['expanded'], new['seconds'], formatRss(new['peakRssKb']), new['cost']))
+            continue
+        problems = []
+        if abs(new['cost'] - old['cost']) > 1e-9 * max(1, abs(old['cost'])):
+            problems.append('cost')
+        if new['expanded'] > old['expanded']:
+            problems.append('expanded')
+        if new['seconds'] > old['seconds'] * timeTolerance:
+            problems.append('time')
+        if new['peakRssKb'] and old['peakRssKb'] and new['peakRssKb'] > old['peakRssKb'] * rssTolerance:
+            problems.append('rss')
+        regressions += len(problems) > 0
+        timeRatio = new['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        print('%-24s %5d %8d -> %7d %9.4f -> %6.4f %4.2fx %7s -> %7s %6.6g -> %-6.6g  %s' %
+              (new['case'], new['size'], old['expanded'], new['expanded'], old['seconds'], new['seconds'],
+               timeRatio, formatRss(old['peakRssKb']), formatRss(new['peakRssKb']), old['cost'], new['cost'],
+               'REGRESSION (%s)' % ', '.join(problems) if problems else 'ok'))
+    missing = [key for key in baseline if key not in results]
+    if missing:
+        print('Not run this time: %s' % ', '.join(sorted(missing)))
+    return regressions
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/searchBenchmark.py <options>')
+    parser.add_option('--sizes', dest='sizes', default='21,41,81',
+                      help='Comma separated maze side lengths [Default: %default]')
+    parser.add_option('--cases', dest='cases', default=None,
+                      help='Comma separated case names to run (see CASES) [Default: all]')
+    parser.add_option('--loops', dest='loops', type='float', default=0.05,
+                      help='Fraction of interior walls removed [Default: %default]')
+    parser.add_option('-s', '--seed', type='int', dest='seed', default=421)
+    parser.add_option('-r', '--repeat', type='int', dest='repeat', default=3,
+                      help='Runs per case; the best wall time is kept [Default: %default]')
+    parser.add_option('--save', dest='save', default=None,
+                      help='Write the results to this baseline file')
+    parser.add_option('--compare', dest='compare', default=None,
+                      help='Compare the results against this baseline file')
+    parser.add_option('--timeTolerance', dest='timeTolerance', type='float', default=1.25,
+                      help='Slowdown ratio reported as a regression [Default: %default]')
+    parser.add_option('--rssTolerance', dest='rssTolerance', type='float', default=1.25,
+                      help='Peak RSS growth ratio reported as a regression [Default: %default]')
+    parser.add_option('--noIsolate', action='store_false', dest='isolate', default=True,
+                      help='Run everything in this process (peak RSS is then cumulative)')
+    options, _ = parser.parse_args(argv)
+
+    cases = CASES
+    if options.cases:
+        names = options.cases.split(',')
+        unknown = [name for name in names if name not in [case[0] for case in CASES]]
+        if unknown:
+            raise Exception('Unknown benchmark cases: ' + ', '.join(unknown))
+        cases = [case for case in CASES if case[0] in names]
+    sizes = [int(s) for s in options.sizes.split(',')]
+
+    print('%-24s %5s %10s %10s %9s %9s %12s' % ('case', 'size', 'expanded', 'generated', 'seconds', 'peak rss', 'cost'))
+    results = runBenchmarks(cases, sizes, options.seed, options.loops, options.repeat, options.isolate)
+
+    if options.save:
+        saveBaseline(options.save, results, options)
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        if (baseline['seed'], baseline['loops']) != (options.seed, options.loops):
+            print('Warning: the baseline was run with seed %d and loops %g' % (baseline['seed'], baseline['loops']))
+        regressions = compareResults(baseline['results'], results, options.timeTolerance, options.rssTolerance)
+        print('%d regression(s)' % regressions)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
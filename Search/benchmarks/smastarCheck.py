@@ -0,0 +1,108 @@
+# smastarCheck.py
+# ---------------
+
+
+"""
+Checks SMA* (search.smastar) where memory is tight: on generated food mazes
+its plans must cost what A*'s do at every memory limit larger than the plan,
+and on random graphs it must find the UCS cost whenever the optimal path
+fits in memory, and return [] (rather than spin) when the goal cannot be
+reached.  The searches that can succeed run under a node budget large
+enough for a correct SMA*, so one that cycles fails the check instead of
+hanging it; the ones with no path to the goal run without a budget, as
+only the search itself can then end them.
+
+> python benchmarks/smastarCheck.py -n 300
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import search
+import searchAgents
+import mazes
+
+
+class GraphProblem(search.SearchProblem):
+    "A search from node 0 to goal over weighted directed edges"
+    def __init__(self, edges, goal):
+        self.edges = edges
+        self.goal = goal
+
+    def getStartState(self):
+        return 0
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return [(target, target, cost) for target, cost in self.edges[state]]
+
+    def getCostOfActions(self, actions):
+        state, total = 0, 0
+        for target in actions:
+            total += dict(self.edges[state])[target]
+            state = target
+        return total
+
+
+def randomGraph(rand, size, reachable):
+    "A GraphProblem on size nodes; its goal has no edges into it unless reachable"
+    goal = rand.randrange(1, size)
+    edges = {}
+    for node in range(size):
+        targets = rand.sample(range(size), rand.randint(0, 3))
+        edges[node] = [(target, rand.randint(1, 5)) for target in targets
+                       if target != node and (reachable or target != goal)]
+    return GraphProblem(edges, goal)
+
+
+def checkMazes(budget):
+    for size, seed, limits in [(7, 1, [17, 30, 60, 300]), (7, 3, [20, 40])]:
+        gameState = mazes.generateGameState(size, size, seed, 0.5, 0.3)
+        problem = searchAgents.FoodSearchProblem(gameState)
+        optimal = problem.getCostOfActions(search.astar(problem, searchAgents.foodHeuristic))
+        for memoryLimit in limits:
+            problem = searchAgents.FoodSearchProblem(gameState)
+            plan = search.smastar(problem, searchAgents.foodHeuristic, memoryLimit, budget)
+            if not plan or problem.getCostOfActions(plan) != optimal:
+                raise Exception('%dx%d maze %d with memoryLimit %d: SMA* gave %s, A* costs %d' %
+                                (size, size, seed, memoryLimit, plan and problem.getCostOfActions(plan), optimal))
+            print('%dx%d maze %d, memoryLimit %3d: cost %d' % (size, size, seed, memoryLimit, optimal))
+
+
+def checkGraphs(numGraphs, budget):
+    unreachable = 0
+    for seed in range(numGraphs):
+        rand = random.Random(seed)
+        problem = randomGraph(rand, 12, seed % 3 != 0)
+        plan = search.ucs(problem)
+        optimal = problem.getCostOfActions(plan) if plan else None
+        unreachable += optimal is None
+        for memoryLimit in [2, 3, 4, 6, 20]:
+            smaPlan = search.smastar(problem, memoryLimit=memoryLimit,
+                                     nodeBudget=budget if optimal is not None else None)
+            cost = problem.getCostOfActions(smaPlan) if smaPlan else None
+            fits = optimal is not None and len(plan) + 2 <= memoryLimit
+            if (fits and cost != optimal) or (cost is not None and (optimal is None or cost < optimal)):
+                raise Exception('Graph %d with memoryLimit %d: SMA* cost %s, UCS cost %s' %
+                                (seed, memoryLimit, cost, optimal))
+    print('%d random graphs (%d with no path to the goal) match UCS' % (numGraphs, unreachable))
+
+
+def main(argv):
+    from optparse import OptionParser
+    parser = OptionParser('python benchmarks/smastarCheck.py <options>')
+    parser.add_option('-n', '--numGraphs', type='int', dest='numGraphs', default=300)
+    parser.add_option('-b', '--budget', type='int', dest='budget', default=100000,
+                      help='Nodes each search may generate [Default: %default]')
+    options, _ = parser.parse_args(argv)
+    checkMazes(options.budget)
+    checkGraphs(options.numGraphs, options.budget)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
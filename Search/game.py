@@ -21,7 +21,7 @@
 # For more info, see http://inst.eecs.berkeley.edu/~cs188/sp09/pacman.html
 
 from util import *
-import time, os
+import time, os, hashlib
 import traceback
 import sys
 
@@ -274,6 +274,139 @@ class Grid:
                 bools.append(False)
         return bools
 
+class BitGrid(Grid):
+    """
+    A Grid of booleans packed into a single Python int, with cell (x,y) at bit
+    x * height + y.  It keeps the grid[x][y] read/write interface, but
+    copy() just shares the (immutable) int, count() is a popcount, hashing
+    hashes one int and asList() only visits set bits.
+
+    The bit order matches the base used by Grid.__hash__, so a BitGrid and a
+    Grid with the same contents are equal and hash the same.  Since there is
+    no shared mutable storage, shallowCopy() is the same as copy().
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def fromGrid(grid):
+        "Builds a BitGrid with the same contents as a list-backed Grid"
+        if isinstance(grid, BitGrid):
+            return grid.copy()
+        g = BitGrid(grid.width, grid.height)
+        bits = 0
+        base = 1
+        for column in grid.data:
+            for cell in column:
+                if cell:
+                    bits |= base
+                base <<= 1
+        g.bits = bits
+        return g
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.width
+        if not 0 <= i < self.width:
+            raise IndexError('grid index out of range')
+        return _BitGridColumn(self, i)
+
+    def __setitem__(self, key, item):
+        column = _BitGridColumn(self, key)
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def _getData(self):
+        return [[(self.bits >> (x * self.height + y)) & 1 == 1 for y in range(self.height)]
+                for x in range(self.width)]
+    # Read-only list-of-lists view, for code written against Grid.data
+    data = property(_getData)
+
+    def __str__(self):
+        out = [['TF'[(self.bits >> (x * self.height + y)) & 1 == 0] for x in range(self.width)]
+               for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None:
+            return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.width == other.width and self.height == other.height
+        return self.data == other.data
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid.__new__(BitGrid)
+        g.CELLS_PER_INT = self.CELLS_PER_INT
+        g.width = self.width
+        g.height = self.height
+        g.bits = self.bits
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item=True):
+        ones = bin(self.bits).count('1')
+        if item:
+            return ones
+        return self.width * self.height - ones
+
+    def asList(self, key=True):
+        bits = self.bits
+        if not key:
+            bits ^= (1 << (self.width * self.height)) - 1
+        height = self.height
+        list = []
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            list.append((index // height, index % height))
+            bits ^= low
+        return list
+
+class _BitGridColumn:
+    "The grid[x] half of a BitGrid lookup; indexing it with y reads or writes one bit."
+    __slots__ = ('grid', 'x')
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def _bit(self, y):
+        height = self.grid.height
+        if y < 0:
+            y += height
+        if not 0 <= y < height:
+            raise IndexError('grid index out of range')
+        return self.x * height + y
+
+    def __getitem__(self, y):
+        return (self.grid.bits >> self._bit(y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        mask = 1 << self._bit(y)
+        if value:
+            self.grid.bits |= mask
+        else:
+            self.grid.bits &= ~mask
+
+    def __len__(self):
+        return self.grid.height
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
@@ -368,21 +501,73 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+class ZobristKeys:
+    """
+    Pseudo-random 64-bit keys for state features such as ('food', (x, y)).
+    A key is a hash of the seed and its feature, made the first time the
+    feature is seen, so no layout size is needed and every process gets the
+    same keys whatever order it meets the features in; states pickled into
+    worker processes keep hashing alike.
+    """
+
+    def __init__(self, seed=421):
+        self.salt = str(seed).encode()
+        self.keys = {}
+
+    def __getitem__(self, feature):
+        key = self.keys.get(feature)
+        if key is None:
+            digest = hashlib.blake2b(repr(canonicalFeature(feature)).encode(), digest_size=8, key=self.salt).digest()
+            key = self.keys[feature] = int.from_bytes(digest, 'little')
+        return key
+
+def canonicalFeature(feature):
+    "feature with whole floats made ints, since positions like (3.0, 2) and (3, 2) are the same"
+    if isinstance(feature, tuple):
+        return tuple(canonicalFeature(part) for part in feature)
+    if isinstance(feature, float) and feature.is_integer():
+        return int(feature)
+    return feature
+
+# Shared by every GameStateData, and by agents that extend their keys
+zobristKeys = ZobristKeys()
+
+def agentZobristKey(index, agentState):
+    "Zobrist key of the agent at index: its position, direction and scared timer"
+    configuration = agentState.configuration
+    if configuration == None:
+        return zobristKeys['agent', index, None]
+    return zobristKeys['agent', index, configuration.pos] ^ \
+        zobristKeys['direction', index, configuration.direction] ^ \
+        zobristKeys['scared', index, agentState.scaredTimer]
+
 class GameStateData:
     """
 
     """
     def __init__( self, prevState = None ):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet from its predecessor.  The food Grid, the
+        capsule list and the AgentStates are shared with the predecessor, not
+        copied: rules that change one of them must replace it rather than
+        edit it in place (see mutableAgentState).
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._zobrist = prevState._zobrist
+            self._agentKeys = prevState._agentKeys
+        else:
+            self._zobrist = None
+
+        # Indices of agentStates that belong to this packet alone
+        self._ownedAgents = set()
+        # Whether _agentKeys is this packet's own list or the predecessor's
+        self._ownsAgentKeys = False
 
         self._foodEaten = None
         self._foodAdded = None
@@ -395,6 +580,9 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
+        state._ownedAgents = set(range(len(state.agentStates)))
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -408,11 +596,68 @@ class GameStateData:
             copiedStates.append( agentState.copy() )
         return copiedStates
 
+    def mutableAgentState( self, index ):
+        """
+        Returns agentStates[index] for editing, first replacing it with a copy
+        if it is still shared with the predecessor this packet was made from.
+        """
+        if index not in self._ownedAgents:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownedAgents.add(index)
+        return self.agentStates[index]
+
+    def zobristKey( self ):
+        """
+        Zobrist key of the agents, food and capsules (the score is left out).
+        The rules keep it up to date through updateAgentKey, updateFoodKey and
+        updateCapsuleKey; code that edits a state any other way should call
+        rehash afterwards.
+        """
+        if self._zobrist is None:
+            self.rehash()
+        return self._zobrist
+
+    def rehash( self ):
+        "Recomputes the Zobrist key from scratch"
+        self._agentKeys = [agentZobristKey(index, agentState) for index, agentState in enumerate(self.agentStates)]
+        self._ownsAgentKeys = True
+        key = 0
+        for agentKey in self._agentKeys:
+            key ^= agentKey
+        for position in self.food.asList():
+            key ^= zobristKeys['food', position]
+        for position in self.capsules:
+            key ^= zobristKeys['capsule', position]
+        self._zobrist = key
+
+    def updateAgentKey( self, index ):
+        "Call after changing agentStates[index]'s configuration or scared timer"
+        if self._zobrist is None:
+            return
+        if not self._ownsAgentKeys:
+            self._agentKeys = self._agentKeys[:]
+            self._ownsAgentKeys = True
+        agentKey = agentZobristKey(index, self.agentStates[index])
+        self._zobrist ^= self._agentKeys[index] ^ agentKey
+        self._agentKeys[index] = agentKey
+
+    def updateFoodKey( self, position ):
+        "Call after adding or removing the food at position"
+        if self._zobrist is not None:
+            self._zobrist ^= zobristKeys['food', position]
+
+    def updateCapsuleKey( self, position ):
+        "Call after adding or removing the capsule at position"
+        if self._zobrist is not None:
+            self._zobrist ^= zobristKeys['capsule', position]
+
     def __eq__( self, other ):
         """
         Allows two states to be compared.
         """
         if other == None: return False
+        # Different Zobrist keys mean different states; equal ones still get compared
+        if self.zobristKey() != getattr(other, 'zobristKey', lambda: None)(): return False
         # TODO Check for type of other
         if not self.agentStates == other.agentStates: return False
         if not self.food == other.food: return False
@@ -422,15 +667,12 @@ class GameStateData:
 
     def __hash__( self ):
         """
-        Allows states to be keys of dictionaries.
+        Allows states to be keys of dictionaries.  The Zobrist key is kept
+        up to date as the state is built, so this is O(1).
         """
-        for i, state in enumerate( self.agentStates ):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                #hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
+        # hash() of a number is the same in every process; a Zobrist key per
+        # score would fill zobristKeys with every score ever seen
+        return self.zobristKey() ^ hash(self.score)
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
@@ -488,7 +730,7 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        self.food = BitGrid.fromGrid(layout.food)
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -503,6 +745,8 @@ class GameStateData:
                 else: numGhosts += 1
             self.agentStates.append( AgentState( Configuration( pos, Directions.STOP), isPacman) )
         self._eaten = [False for a in self.agentStates]
+        self._ownedAgents = set(range(len(self.agentStates)))
+        self.rehash()
 
 try:
     import boinc
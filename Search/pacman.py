@@ -43,6 +43,7 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
 import util, layout
@@ -71,14 +72,40 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # Instrumentation of generateSuccessor, off by default: recording explored
+    # states hashes two whole GameStates per successor and keeps every one of
+    # them alive.  See setInstrumentation.
+    instrumentation = None
+    expanded = 0
     explored = set()
+    exploredLimit = None
     def getAndResetExplored():
         tmp = GameState.explored.copy()
         GameState.explored = set()
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def getAndResetExpanded():
+        tmp = GameState.expanded
+        GameState.expanded = 0
+        return tmp
+    getAndResetExpanded = staticmethod(getAndResetExpanded)
+
+    def setInstrumentation(mode=None, exploredLimit=None):
+        """
+        mode is None (record nothing), 'count' (count generateSuccessor calls in
+        GameState.expanded) or 'explored' (count them and also add parent and
+        successor to GameState.explored).  With an exploredLimit, explored
+        stops growing once it holds that many states.
+        """
+        if mode not in INSTRUMENTATION_MODES:
+            raise Exception('Unknown instrumentation mode: ' + str(mode))
+        GameState.instrumentation = mode
+        GameState.exploredLimit = exploredLimit
+        GameState.expanded = 0
+        GameState.explored = set()
+    setInstrumentation = staticmethod(setInstrumentation)
+
     def getLegalActions( self, agentIndex=0 ):
         """
         Returns the legal actions for the agent specified.
@@ -112,7 +139,8 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY # Penalty for waiting around
         else:
-            GhostRules.decrementTimer( state.data.agentStates[agentIndex] )
+            GhostRules.decrementTimer( state.data.mutableAgentState(agentIndex) )
+            state.data.updateAgentKey(agentIndex)
 
         # Resolve multi-agent effects
         GhostRules.checkDeath( state, agentIndex )
@@ -120,8 +148,12 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.instrumentation is not None:
+            GameState.expanded += 1
+            if GameState.instrumentation == 'explored' and \
+                    (GameState.exploredLimit is None or len(GameState.explored) < GameState.exploredLimit):
+                GameState.explored.add(self)
+                GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -262,6 +294,7 @@ class GameState:
 SCARED_TIME = 40    # Moves ghosts are scared
 COLLISION_TOLERANCE = 0.7 # How close ghosts must be to Pacman to kill
 TIME_PENALTY = 1 # Number of points lost each round
+INSTRUMENTATION_MODES = [None, 'count', 'explored'] # See GameState.setInstrumentation
 
 class ClassicGameRules:
     """
@@ -342,11 +375,12 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.mutableAgentState(0)
 
         # Update Configuration
         vector = Actions.directionToVector( action, PacmanRules.PACMAN_SPEED )
         pacmanState.configuration = pacmanState.configuration.generateSuccessor( vector )
+        state.data.updateAgentKey(0)
 
         # Eat
         next = pacmanState.configuration.getPosition()
@@ -363,6 +397,7 @@ class PacmanRules:
             state.data.scoreChange += 10
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
+            state.data.updateFoodKey(position)
             state.data._foodEaten = position
             # TODO: cache numFood?
             numFood = state.getNumFood()
@@ -371,11 +406,13 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if( position in state.getCapsules() ):
-            state.data.capsules.remove( position )
+            state.data.capsules = [capsule for capsule in state.data.capsules if capsule != position]
             state.data._capsuleEaten = position
+            state.data.updateCapsuleKey(position)
             # Reset all ghosts' scared timers
             for index in range( 1, len( state.data.agentStates ) ):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.mutableAgentState(index).scaredTimer = SCARED_TIME
+                state.data.updateAgentKey(index)
     consume = staticmethod( consume )
 
 class GhostRules:
@@ -404,17 +441,20 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.mutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0: speed /= 2.0
         vector = Actions.directionToVector( action, speed )
         ghostState.configuration = ghostState.configuration.generateSuccessor( vector )
+        state.data.updateAgentKey(ghostIndex)
     applyAction = staticmethod( applyAction )
 
     def decrementTimer( ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint( ghostState.configuration.pos )
+            # Replace the Configuration rather than editing it: it may be shared with earlier states
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration(nearestPoint(configuration.pos), configuration.direction)
         ghostState.scaredTimer = max( 0, timer - 1 )
     decrementTimer = staticmethod( decrementTimer )
 
@@ -425,12 +465,12 @@ class GhostRules:
                 ghostState = state.data.agentStates[index]
                 ghostPosition = ghostState.configuration.getPosition()
                 if GhostRules.canKill( pacmanPosition, ghostPosition ):
-                    GhostRules.collide( state, ghostState, index )
+                    GhostRules.collide( state, state.data.mutableAgentState(index), index )
         else:
             ghostState = state.data.agentStates[agentIndex]
             ghostPosition = ghostState.configuration.getPosition()
             if GhostRules.canKill( pacmanPosition, ghostPosition ):
-                GhostRules.collide( state, ghostState, agentIndex )
+                GhostRules.collide( state, state.data.mutableAgentState(agentIndex), agentIndex )
     checkDeath = staticmethod( checkDeath )
 
     def collide( state, ghostState, agentIndex):
@@ -438,7 +478,9 @@ class GhostRules:
             state.data.scoreChange += 200
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
+            state.data.updateAgentKey(agentIndex)
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -523,6 +565,11 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--instrument', dest='instrumentation', type='choice',
+                      choices=['none', 'count', 'explored'], default='none',
+                      help=default('Record generated successors: none, count, or explored (also keeps the states)'))
+    parser.add_option('--exploredLimit', dest='exploredLimit', type='int', default=None,
+                      help='Most states to keep when instrumenting with explored')
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -532,6 +579,9 @@ def readCommand( argv ):
     # Fix the random seed
     if options.fixRandomSeed: random.seed('cs188')
 
+    if options.instrumentation != 'none':
+        GameState.setInstrumentation( options.instrumentation, options.exploredLimit )
+
     # Choose a layout
     args['layout'] = layout.getLayout( options.layout )
     if args['layout'] == None: raise Exception("The layout " + options.layout + " cannot be found")
@@ -662,6 +712,8 @@ def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0
         print('Scores:       ', ', '.join([str(score) for score in scores]))
         print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
         print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+    if GameState.instrumentation is not None:
+        print('Successors:    %d generated' % GameState.expanded)
 
     return games
 
@@ -18,6 +18,9 @@ Pacman agents (in searchAgents.py).
 """
 
 import util
+import json
+import time
+import collections
 
 class SearchProblem:
     """
@@ -62,6 +65,150 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchStats:
+    """
+    Counters and timers for one search.  InstrumentedProblem fills in the
+    successor figures, and the search functions below add the frontier,
+    duplicate and heuristic figures when they are given an
+    InstrumentedProblem.
+    """
+
+    def __init__(self):
+        self.expanded = 0           # getSuccessors calls
+        self.generated = 0          # successors those calls returned
+        self.duplicates = 0         # frontier entries popped for states already closed
+        self.peakFrontier = 0       # most entries waiting on the frontier at once
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0    # seconds inside the heuristic
+        self.heuristicCacheHits = 0 # filled in when the heuristic is a HeuristicCache
+        self.heuristicCacheMisses = 0
+        self.successorTime = 0.0    # seconds inside getSuccessors
+        self.searchTime = 0.0       # seconds for the whole search, if the caller sets it
+
+    def noteFrontier(self, size):
+        if size > self.peakFrontier:
+            self.peakFrontier = size
+
+    def timedHeuristic(self, heuristic):
+        "Returns heuristic wrapped so that its calls are counted and timed here"
+        def timed(state, problem=None):
+            start = time.perf_counter()
+            value = heuristic(state, problem)
+            self.heuristicTime += time.perf_counter() - start
+            self.heuristicCalls += 1
+            return value
+        return timed
+
+    def asDict(self):
+        return dict(self.__dict__)
+
+    def toJson(self):
+        return json.dumps(self.asDict(), indent=2, sort_keys=True)
+
+    def __str__(self):
+        lines = ['Nodes expanded: %d, generated: %d, duplicates: %d' % (self.expanded, self.generated, self.duplicates),
+                 'Peak frontier size: %d' % self.peakFrontier,
+                 'Heuristic: %d calls, %.3f seconds' % (self.heuristicCalls, self.heuristicTime),
+                 'Successor generation: %.3f seconds' % self.successorTime]
+        lookups = self.heuristicCacheHits + self.heuristicCacheMisses
+        if lookups > 0:
+            lines.append('Heuristic cache: %d hits, %d misses (%.1f%% hit rate)' %
+                         (self.heuristicCacheHits, self.heuristicCacheMisses, 100.0 * self.heuristicCacheHits / lookups))
+        if self.searchTime > 0:
+            lines.append('Expansions per second: %.0f' % (self.expanded / self.searchTime))
+        return '\n'.join(lines)
+
+class InstrumentedProblem:
+    """
+    Wraps a SearchProblem so that searching it records a SearchStats in
+    self.searchStats.  Every other attribute is read from the wrapped
+    problem, so heuristics see its walls, heuristicInfo and so on.
+    """
+
+    def __init__(self, problem, stats=None):
+        self.problem = problem
+        self.searchStats = stats if stats is not None else SearchStats()
+        if 'getReverseSuccessors' in dir(problem):
+            self.getReverseSuccessors = self._getReverseSuccessors
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__dict__) | set(dir(self.problem)))
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        start = time.perf_counter()
+        successors = self.problem.getSuccessors(state)
+        stats = self.searchStats
+        stats.successorTime += time.perf_counter() - start
+        stats.expanded += 1
+        stats.generated += len(successors)
+        return successors
+
+    def _getReverseSuccessors(self, state):
+        start = time.perf_counter()
+        predecessors = self.problem.getReverseSuccessors(state)
+        stats = self.searchStats
+        stats.successorTime += time.perf_counter() - start
+        stats.expanded += 1
+        stats.generated += len(predecessors)
+        return predecessors
+
+    def getCostOfActions(self, actions):
+        return self.problem.getCostOfActions(actions)
+
+class HeuristicCache:
+    """
+    Memoizes a heuristic by state, keeping the values of the maxSize most
+    recently used states.  A value only holds for one problem, so the cache
+    (and its hits, misses and evictions counters) starts over whenever it
+    is called with a different problem.  Use it in place of the heuristic:
+
+      search.aStarSearch(problem, search.HeuristicCache(foodHeuristic))
+    """
+
+    def __init__(self, heuristic, maxSize=100000):
+        self.heuristic = heuristic
+        self.maxSize = int(maxSize)
+        self.values = collections.OrderedDict()
+        self.problem = None
+        self.hits = self.misses = self.evictions = 0
+
+    def __call__(self, state, problem=None):
+        if problem is not self.problem:
+            self.values.clear()
+            self.problem = problem
+            self.hits = self.misses = self.evictions = 0
+        values = self.values
+        if state in values:
+            self.hits += 1
+            values.move_to_end(state)
+            return values[state]
+        self.misses += 1
+        value = values[state] = self.heuristic(state, problem)
+        if len(values) > self.maxSize:
+            values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / float(lookups) if lookups else 0.0
+
+def searchStats(problem):
+    """Returns the SearchStats an InstrumentedProblem is recording into, or None."""
+    if isinstance(problem, InstrumentedProblem):
+        return problem.searchStats
+    return None
+
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -84,6 +231,7 @@ def depthFirstSearch(problem):
     """
     "*** YOUR CODE HERE ***"
     
+    stats = searchStats(problem)
     frontier = util.Stack()
     node = (problem.getStartState(), tuple([]), 0.0)
     frontier.push(node)
@@ -101,6 +249,9 @@ def depthFirstSearch(problem):
             for successor in problem.getSuccessors(node[0]):
                 successor_node = process_node(node, successor)
                 frontier.push(successor_node)
+            if stats: stats.noteFrontier(len(frontier))
+        elif stats:
+            stats.duplicates += 1
 
     return []
 
@@ -112,6 +263,7 @@ def process_node(node, successor):
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
     "*** YOUR CODE HERE ***"
+    stats = searchStats(problem)
     frontier = util.Queue()
     node = (problem.getStartState(), tuple([]), 0.0)
     frontier.push(node)
@@ -126,15 +278,17 @@ def breadthFirstSearch(problem):
             if problem.isGoalState(node[0]):
                 return list(node[1])
 
-            for successor in problem.getSuccessors(node[0]):
-                successor_node = process_node(node, successor)
-                frontier.push(successor_node)
+            frontier.extend(process_node(node, successor) for successor in problem.getSuccessors(node[0]))
+            if stats: stats.noteFrontier(len(frontier))
+        elif stats:
+            stats.duplicates += 1
 
     return []
 
 def uniformCostSearch(problem):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
+    stats = searchStats(problem)
     frontier = util.PriorityQueue()
     node = (problem.getStartState(), tuple([]), 0.0)
     frontier.push(node, 0)
@@ -152,6 +306,9 @@ def uniformCostSearch(problem):
             for successor in problem.getSuccessors(node[0]):
                 successor_node = process_node(node, successor)
                 frontier.push(successor_node, successor_node[2])
+            if stats: stats.noteFrontier(len(frontier))
+        elif stats:
+            stats.duplicates += 1
 
     return []
 
@@ -165,6 +322,8 @@ def nullHeuristic(state, problem=None):
 def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
+    stats = searchStats(problem)
+    if stats: heuristic = stats.timedHeuristic(heuristic)
     frontier = util.PriorityQueue()
     node = (problem.getStartState(), tuple([]), 0.0)
     frontier.push(node, heuristic(node[0], problem))
@@ -180,14 +339,487 @@ def aStarSearch(problem, heuristic=nullHeuristic):
                 return list(node[1])
 
             for successor in problem.getSuccessors(node[0]):
+                # A closed successor would only be popped and skipped, so
+                # don't spend a heuristic call on it
+                if successor[0] in visited:
+                    continue
                 successor_node = process_node(node, successor)
                 frontier.push(successor_node, successor_node[2] + heuristic(successor_node[0], problem))
+            if stats: stats.noteFrontier(len(frontier))
+        elif stats:
+            stats.duplicates += 1
+
+    return []
+
+def parentPointerAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    A* search that keeps a table of parent pointers instead of carrying the
+    whole action tuple in every frontier node.  The table maps each state to
+    (parent, action, cost) for the cheapest path found so far, and the plan is
+    only rebuilt once a goal is popped.
+    """
+    stats = searchStats(problem)
+    if stats: heuristic = stats.timedHeuristic(heuristic)
+    start = problem.getStartState()
+    parents = {start: (None, None, 0.0)}
+    frontier = util.PriorityQueue()
+    frontier.push((start, 0.0), heuristic(start, problem))
+    visited = set()
+
+    while not frontier.isEmpty():
+        state, cost = frontier.pop()
+
+        # Skip closed states and entries superseded by a cheaper path
+        if state in visited or cost > parents[state][2]:
+            if stats: stats.duplicates += 1
+            continue
+        visited.add(state)
+
+        if problem.isGoalState(state):
+            return reconstruct_path(parents, state)
+
+        for successor, action, stepCost in problem.getSuccessors(state):
+            if successor in visited:
+                continue
+            new_cost = cost + stepCost
+            if successor not in parents or new_cost < parents[successor][2]:
+                parents[successor] = (state, action, new_cost)
+                frontier.push((successor, new_cost), new_cost + heuristic(successor, problem))
+        if stats: stats.noteFrontier(len(frontier))
 
     return []
 
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, reverseHeuristic=nullHeuristic):
+    """
+    Bidirectional A* over parent-pointer tables.
+
+    Runs only when the problem exposes getGoalState() (returning a single goal
+    state, or None if there isn't one) and getReverseSuccessors(state), which
+    returns (predecessor, action, stepCost) triples where 'action' leads from
+    the predecessor to 'state'.  Otherwise this falls back to
+    parentPointerAStarSearch.
+
+    heuristic estimates the cost to the goal and reverseHeuristic the cost back
+    to the start; both must be admissible.  Search stops once the best meeting
+    cost is no larger than the smallest f-value on either frontier.
+    """
+    goal = None
+    if 'getReverseSuccessors' in dir(problem) and 'getGoalState' in dir(problem):
+        goal = problem.getGoalState()
+    if goal is None:
+        return parentPointerAStarSearch(problem, heuristic)
+
+    start = problem.getStartState()
+    if start == goal:
+        return []
+
+    stats = searchStats(problem)
+    if stats:
+        heuristic = stats.timedHeuristic(heuristic)
+        reverseHeuristic = stats.timedHeuristic(reverseHeuristic)
+
+    forward = {start: (None, None, 0.0)}
+    backward = {goal: (None, None, 0.0)}
+    forward_frontier = util.PriorityQueue()
+    backward_frontier = util.PriorityQueue()
+    forward_frontier.push((start, 0.0), heuristic(start, problem))
+    backward_frontier.push((goal, 0.0), reverseHeuristic(goal, problem))
+    forward_visited, backward_visited = set(), set()
+    best_cost, meeting = float('inf'), None
+
+    while not forward_frontier.isEmpty() and not backward_frontier.isEmpty():
+        forward_min = min_priority(forward_frontier, forward, forward_visited, stats)
+        backward_min = min_priority(backward_frontier, backward, backward_visited, stats)
+        if forward_min is None or backward_min is None:
+            break
+        if best_cost <= max(forward_min, backward_min):
+            break
+
+        # Expand whichever side currently has the smaller frontier
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, table, visited, other = forward_frontier, forward, forward_visited, backward
+            expand, estimate = problem.getSuccessors, heuristic
+        else:
+            frontier, table, visited, other = backward_frontier, backward, backward_visited, forward
+            expand, estimate = problem.getReverseSuccessors, reverseHeuristic
+
+        state, cost = frontier.pop()
+        visited.add(state)
+
+        for successor, action, stepCost in expand(state):
+            if successor in visited:
+                continue
+            new_cost = cost + stepCost
+            if successor not in table or new_cost < table[successor][2]:
+                table[successor] = (state, action, new_cost)
+                frontier.push((successor, new_cost), new_cost + estimate(successor, problem))
+            if successor in other and table[successor][2] + other[successor][2] < best_cost:
+                best_cost = table[successor][2] + other[successor][2]
+                meeting = successor
+        if stats: stats.noteFrontier(len(forward_frontier) + len(backward_frontier))
+
+    if meeting is None:
+        return []
+
+    actions = reconstruct_path(forward, meeting)
+    state = meeting
+    while backward[state][0] is not None:
+        state, action, _ = backward[state]
+        actions.append(action)
+    return actions
+
+def jumpPointSearch(problem, heuristic=nullHeuristic):
+    """
+    A* over jump points, for problems whose moves all cost 1 on a
+    4-connected grid: ones with problem.walls, a single goal from
+    getGoalState() and isUnitCost() returning True, such as a
+    PositionSearchProblem with the default costFn.  Anything else (a custom
+    costFn, AnyFoodSearchProblem, ...) goes to aStarSearch instead.
+
+    From each jump point the search runs straight on in each direction
+    until it reaches the goal or a cell with an opening to either side,
+    which becomes the next jump point; a run that ends in a wall is a dead
+    end and is dropped.  Every shortest path only turns at such cells, so
+    this loses nothing, and a corridor costs one hop however long it is.
+    The plan is a bfs-style list of Directions of the same (optimal) cost,
+    though among equally short paths it may pick a different one.
+    """
+    if 'isUnitCost' not in dir(problem) or not problem.isUnitCost() or problem.getGoalState() is None:
+        return aStarSearch(problem, heuristic)
+
+    from game import Directions
+    stats = searchStats(problem)
+    if stats: heuristic = stats.timedHeuristic(heuristic)
+    counted = problem.problem if isinstance(problem, InstrumentedProblem) else problem
+    walls, goal = problem.walls, problem.getGoalState()
+    moves = [(Directions.NORTH, 0, 1), (Directions.SOUTH, 0, -1), (Directions.EAST, 1, 0), (Directions.WEST, -1, 0)]
+
+    def jump(x, y, dx, dy):
+        # Returns (jump point, run length) going from (x, y) towards (dx, dy)
+        length = 0
+        while not walls[x + dx][y + dy]:
+            x, y = x + dx, y + dy
+            length += 1
+            if (x, y) == goal:
+                return (x, y), length
+            if dx == 0 and (not walls[x + 1][y] or not walls[x - 1][y]):
+                return (x, y), length
+            if dy == 0 and (not walls[x][y + 1] or not walls[x][y - 1]):
+                return (x, y), length
+        return None
+
+    start = problem.getStartState()
+    # Jump point -> (previous jump point, direction, run length, cost)
+    parents = {start: (None, None, 0, 0)}
+    frontier = util.PriorityQueue()
+    frontier.push((start, 0), heuristic(start, problem))
+    visited = set()
+
+    while not frontier.isEmpty():
+        state, cost = frontier.pop()
+
+        if state in visited or cost > parents[state][3]:
+            if stats: stats.duplicates += 1
+            continue
+        visited.add(state)
+
+        if problem.isGoalState(state):
+            actions = []
+            while parents[state][0] is not None:
+                state, direction, length, _ = parents[state]
+                actions.extend([direction] * length)
+            actions.reverse()
+            return actions
+
+        if '_expanded' in dir(counted): counted._expanded += 1
+        x, y = int(state[0]), int(state[1])
+        for direction, dx, dy in moves:
+            found = jump(x, y, dx, dy)
+            if found is None:
+                continue
+            successor, length = found
+            if stats: stats.generated += 1
+            if successor in visited:
+                continue
+            new_cost = cost + length
+            if successor not in parents or new_cost < parents[successor][3]:
+                parents[successor] = (state, direction, length, new_cost)
+                frontier.push((successor, new_cost), new_cost + heuristic(successor, problem))
+        if stats:
+            stats.expanded += 1
+            stats.noteFrontier(len(frontier))
+
+    return []
+
+def nearestGoalSearch(problem, goals):
+    """
+    Uniform cost search from the start state to whichever state in goals (a
+    set, so the goal test is a hash lookup) is cheapest to reach.  Returns
+    (goal, actions), or (None, []) if no goal is reachable.  Ties go to the
+    goal found first, so with unit costs this is the goal bfs would return.
+    """
+    stats = searchStats(problem)
+    start = problem.getStartState()
+    parents = {start: (None, None, 0.0)}
+    frontier = util.PriorityQueue()
+    frontier.push((start, 0.0), 0.0)
+    visited = set()
+
+    while not frontier.isEmpty():
+        state, cost = frontier.pop()
+
+        if state in visited or cost > parents[state][2]:
+            if stats: stats.duplicates += 1
+            continue
+        visited.add(state)
+
+        if state in goals:
+            return state, reconstruct_path(parents, state)
+
+        for successor, action, stepCost in problem.getSuccessors(state):
+            if successor in visited:
+                continue
+            new_cost = cost + stepCost
+            if successor not in parents or new_cost < parents[successor][2]:
+                parents[successor] = (state, action, new_cost)
+                frontier.push((successor, new_cost), new_cost)
+        if stats: stats.noteFrontier(len(frontier))
+
+    return None, []
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, nodeBudget=None):
+    """
+    IDA*: a series of depth-first searches, each cut off where g + h exceeds a
+    bound that starts at h(start) and rises to the smallest f that went over
+    it in the previous pass.  Only the current path and the untried
+    successors along it are kept, at the price of re-expanding states.
+    States already on the current path are skipped, so cycles are harmless.
+
+    nodeBudget caps the total number of expansions; [] is returned if it
+    runs out or no goal is reachable.  The frontier an instrumented run
+    reports is the path plus the untried successors along it.
+    """
+    stats = searchStats(problem)
+    if stats: heuristic = stats.timedHeuristic(heuristic)
+    start = problem.getStartState()
+    bound = heuristic(start, problem)
+    expansions = 0
+
+    while True:
+        next_bound = float('inf')
+        # Each entry is [state, cost, untried successors (None until expanded)]
+        stack = [[start, 0.0, None]]
+        on_path = set([start])
+        actions = []
+        pending = 0
+
+        while stack:
+            entry = stack[-1]
+            state, cost, successors = entry
+            if successors is None:
+                f = cost + heuristic(state, problem)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    successors = []
+                else:
+                    if problem.isGoalState(state):
+                        return actions
+                    if nodeBudget is not None and expansions >= int(nodeBudget):
+                        return []
+                    expansions += 1
+                    successors = list(problem.getSuccessors(state))
+                    successors.reverse()
+                    pending += len(successors)
+                    if stats: stats.noteFrontier(len(stack) + pending)
+                entry[2] = successors
+
+            if successors:
+                successor, action, stepCost = successors.pop()
+                pending -= 1
+                if successor not in on_path:
+                    stack.append([successor, cost + stepCost, None])
+                    on_path.add(successor)
+                    actions.append(action)
+                elif stats:
+                    stats.duplicates += 1
+            else:
+                stack.pop()
+                on_path.discard(state)
+                if actions:
+                    actions.pop()
+
+        if next_bound == float('inf'):
+            return []
+        bound = next_bound
+
+class SMANode:
+    "A node of the simplified memory-bounded A* search tree"
+    __slots__ = ('state', 'parent', 'action', 'index', 'cost', 'f', 'depth',
+                 'successors', 'unexplored', 'forgotten', 'children')
+
+    def __init__(self, state, parent, action, index, cost, depth):
+        self.state, self.parent, self.action, self.index = state, parent, action, index
+        self.cost, self.depth = cost, depth
+        self.f = 0
+        self.successors = None  # (state, action, cost) triples once expanded
+        self.unexplored = collections.deque()  # indices of successors never generated
+        self.forgotten = {}     # successor index -> f of a child that was dropped
+        self.children = {}      # successor index -> child node in memory
+
+def simplifiedMemoryBoundedAStarSearch(problem, heuristic=nullHeuristic, memoryLimit=10000, nodeBudget=None):
+    """
+    SMA*: A* that keeps at most memoryLimit nodes.  Successors are generated
+    one at a time, and when memory is full the shallowest of the worst
+    (highest f) leaves is dropped, its f remembered by its parent so the
+    subtree is only regenerated once everything better has been tried.  Once
+    all of a node's successors have been generated its f is backed up to the
+    smallest f of its children, in memory or forgotten, so the search still
+    returns an optimal plan as long as memoryLimit is larger than the number
+    of steps in it (with an admissible heuristic).
+
+    nodeBudget caps the number of nodes generated, regenerated ones
+    included.  [] is returned if that runs out, or if no goal is reachable
+    within the memory limit.
+    """
+    stats = searchStats(problem)
+    if stats: heuristic = stats.timedHeuristic(heuristic)
+    memoryLimit = int(memoryLimit)
+    if memoryLimit < 2:
+        raise ValueError('SMA* needs a memoryLimit of at least 2, got %d' % memoryLimit)
+    inf = float('inf')
+    start = problem.getStartState()
+    root = SMANode(start, None, None, None, 0.0, 0)
+    root.f = heuristic(start, problem)
+    # Nodes with a successor to generate, keyed on the best f it can have
+    # (lowest first, deepest breaking ties)
+    frontier = util.IndexedPriorityQueue()
+    # Leaves of the tree in memory, worst (highest f, shallowest) first
+    leaves = util.IndexedPriorityQueue()
+    in_memory = 1
+    generated = 0
+
+    def requeue(node):
+        # Puts node in, or takes it out of, the frontier and the leaves
+        if node.successors is None or node.unexplored:
+            frontier.push(node, (node.f, -node.depth))
+        elif node.forgotten:
+            frontier.push(node, (min(node.forgotten.values()), -node.depth))
+        elif node in frontier:
+            frontier.remove(node)
+        if not node.children:
+            leaves.push(node, (-node.f, node.depth))
+        elif node in leaves:
+            leaves.remove(node)
+
+    def back_up(node):
+        # Once every successor of node has been generated its f is the best of theirs
+        while node is not None and node.successors is not None and not node.unexplored:
+            f = min([child.f for child in node.children.values()] + list(node.forgotten.values()) + [inf])
+            if f == node.f:
+                return
+            node.f = f
+            requeue(node)
+            node = node.parent
+
+    def on_path(node, state):
+        while node is not None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    requeue(root)
+    while not frontier.isEmpty():
+        node, (f, _) = frontier.peek()
+        if f == inf:
+            return []
+        if node.successors is None:
+            if problem.isGoalState(node.state):
+                actions = []
+                while node.parent is not None:
+                    actions.append(node.action)
+                    node = node.parent
+                actions.reverse()
+                return actions
+            successors = problem.getSuccessors(node.state)
+            node.successors = [successor for successor in successors if not on_path(node, successor[0])]
+            if stats: stats.duplicates += len(successors) - len(node.successors)
+            node.unexplored = collections.deque(range(len(node.successors)))
+            if not node.unexplored:
+                # A dead end: nothing below it can reach a goal
+                node.f = inf
+                requeue(node)
+                back_up(node.parent)
+                continue
+
+        if nodeBudget is not None and generated >= int(nodeBudget):
+            return []
+        generated += 1
+        if node.unexplored:
+            index, forgottenF = node.unexplored.popleft(), 0
+        else:
+            # Regenerate the best of the children that were dropped
+            index = min(node.forgotten, key=node.forgotten.get)
+            forgottenF = node.forgotten.pop(index)
+        state, action, stepCost = node.successors[index]
+        child = SMANode(state, node, action, index, node.cost + stepCost, node.depth + 1)
+        if child.depth >= memoryLimit - 1 and not problem.isGoalState(state):
+            # Too deep for a path to it to fit in memory
+            child.f = inf
+        else:
+            child.f = max(node.f, child.cost + heuristic(state, problem), forgottenF)
+        node.children[index] = child
+        in_memory += 1
+        requeue(node)
+        requeue(child)
+        back_up(node)
+
+        # Make room by dropping the worst leaves, which may be the new child
+        while in_memory > memoryLimit:
+            worst = leaves.pop()
+            if worst in frontier:
+                frontier.remove(worst)
+            parent = worst.parent
+            del parent.children[worst.index]
+            parent.forgotten[worst.index] = worst.f
+            in_memory -= 1
+            requeue(parent)
+            back_up(parent)
+        if stats: stats.noteFrontier(len(frontier))
+
+    return []
+
+def reconstruct_path(parents, state):
+    """Follows parent pointers back from state and returns the actions in order."""
+    actions = []
+    parent, action, _ = parents[state]
+    while parent is not None:
+        actions.append(action)
+        parent, action, _ = parents[parent]
+    actions.reverse()
+    return actions
+
+def min_priority(frontier, table, visited, stats=None):
+    """
+    Drops closed or superseded entries from the top of a parent-pointer
+    frontier and returns the smallest live priority, or None if it ran dry.
+    """
+    while not frontier.isEmpty():
+        (state, cost), priority = frontier.peek()
+        if state not in visited and cost <= table[state][2]:
+            return priority
+        frontier.pop()
+        if stats: stats.duplicates += 1
+    return None
+
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+ppastar = parentPointerAStarSearch
+biastar = bidirectionalAStarSearch
+idastar = iterativeDeepeningAStarSearch
+jps = jumpPointSearch
+smastar = simplifiedMemoryBoundedAStarSearch
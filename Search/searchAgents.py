@@ -37,9 +37,15 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
 import util
 import time
 import search
+import os
+import mmap
+import array
+import hashlib
+import collections
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -69,12 +75,29 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    Any other agent arguments are passed on to the search function, e.g.
+      -a fn=smastar,heuristic=foodHeuristic,prob=FoodSearchProblem,memoryLimit=5000
+
+    With stats=True or statsFile=<path>, the search runs on a
+    search.InstrumentedProblem; its SearchStats are printed, kept in
+    self.searchStats and, with statsFile, written out as JSON.
+    heuristicCache=<size> memoizes the heuristic in a search.HeuristicCache
+    of that many states.  distanceCache=<dir> keeps the maze distance tables
+    behind mazeDistance and the food heuristics in <dir>, memory-mapped, so
+    later runs on the same layout skip computing them (the
+    PACMAN_DISTANCE_CACHE environment variable sets a default directory):
+      -a fn=astar,prob=FoodSearchProblem,heuristic=foodHeuristic,distanceCache=/tmp/pacman
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', stats='False', statsFile=None, heuristicCache=None, distanceCache=None, **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
+        self.stats = str(stats) == 'True' or statsFile is not None
+        self.statsFile = statsFile
+        self.heuristicCache = None
+        if distanceCache is not None:
+            setDistanceCacheDir(distanceCache)
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
@@ -82,7 +105,7 @@ class SearchAgent(Agent):
         func = getattr(search, fn)
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            self.searchFunction = lambda x: func(x, **searchArgs)
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -90,9 +113,12 @@ class SearchAgent(Agent):
                 heur = getattr(search, heuristic)
             else:
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
+            if heuristicCache is not None:
+                heur = search.HeuristicCache(heur, int(heuristicCache))
+                self.heuristicCache = heur
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -112,10 +138,26 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        # Subclasses may not call SearchAgent.__init__, and then keep the plain output
+        stats = getattr(self, 'stats', False)
+        instrumented = search.InstrumentedProblem(problem) if stats else problem
+        self.actions  = self.searchFunction(instrumented) # Find a path
+        if 'expandActions' in dir(problem): self.actions = problem.expandActions(self.actions)
+        elapsed = time.time() - starttime
         totalCost = problem.getCostOfActions(self.actions)
-        print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
+        print('Path found with total cost of %d in %.1f seconds' % (totalCost, elapsed))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        self.searchStats = None
+        if stats:
+            self.searchStats = instrumented.searchStats
+            self.searchStats.searchTime = elapsed
+            cache = getattr(self, 'heuristicCache', None)
+            if cache is not None:
+                self.searchStats.heuristicCacheHits, self.searchStats.heuristicCacheMisses = cache.hits, cache.misses
+            print(self.searchStats)
+            if self.statsFile:
+                with open(self.statsFile, 'w') as f:
+                    f.write(self.searchStats.toJson())
 
     def getAction(self, state):
         """
@@ -133,6 +175,10 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+def unitCost(position):
+    "The default PositionSearchProblem costFn: every step costs 1"
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -142,9 +188,13 @@ class PositionSearchProblem(search.SearchProblem):
     The state space consists of (x,y) positions in a pacman game.
 
     Note: this search problem is fully specified; you should NOT change it.
+
+    Successors come from the MazeGraph shared by every problem on the same
+    walls.  With the default unitCost the (successor, action, cost) lists are
+    the graph's own, so callers must not modify them.
     """
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
 
@@ -161,6 +211,9 @@ class PositionSearchProblem(search.SearchProblem):
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print('Warning: this does not look like a regular search maze')
 
+        self.graph = getMazeGraph(self.walls)
+        self.successorTable = self.graph.successorTable(costFn)
+
         # For display purposes
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
@@ -192,24 +245,42 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        successors = self.successorTable[self.graph.cellIndex[state]]
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
-        if state not in self._visited:
+        if self.visualize and state not in self._visited:
             self._visited[state] = True
             self._visitedlist.append(state)
 
         return successors
 
+    def getGoalState(self):
+        "The single goal position, used by search.bidirectionalAStarSearch."
+        return self.goal
+
+    def isUnitCost(self):
+        "Whether every move costs 1, which search.jumpPointSearch relies on."
+        return self.costFn is unitCost
+
+    def getReverseSuccessors(self, state):
+        """
+        Returns (predecessor, action, stepCost) triples, where 'action' moves
+        from the predecessor into 'state' and 'stepCost' is what that move
+        costs.  Moves on the board are reversible, so the predecessors are just
+        the open neighbors.
+        """
+        cost = self.costFn(state)
+        predecessors = [(previous, action, cost) for previous, action in self.graph.reverseMoves[self.graph.cellIndex[state]]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if self.visualize and state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -226,6 +297,57 @@ class PositionSearchProblem(search.SearchProblem):
             cost += self.costFn((x,y))
         return cost
 
+class CorridorSearchProblem(PositionSearchProblem):
+    """
+    A PositionSearchProblem on the layout's CorridorGraph: states are only
+    the junctions, dead ends, start and goal, and each successor runs down a
+    whole corridor.  Its action is the tuple of Directions for that
+    corridor and its cost the sum of costFn along it; expandActions turns a
+    plan back into single Directions (SearchAgent does this for you).
+
+    > python pacman.py -l bigMaze -p SearchAgent -a fn=astar,prob=CorridorSearchProblem,heuristic=manhattanHeuristic
+    """
+
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True):
+        PositionSearchProblem.__init__(self, gameState, costFn, goal, start, warn, visualize)
+        self.corridors = getCorridorGraph(self.walls, [self.startState, self.goal], costFn)
+
+    def getSuccessors(self, state):
+        successors = self.corridors.edges[state]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if self.visualize and state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return successors
+
+    def getReverseSuccessors(self, state):
+        predecessors = self.corridors.reverseEdges[state]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if self.visualize and state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
+    def expandActions(self, actions):
+        "Flattens a plan of corridor action tuples into a list of Directions"
+        return expandCorridorActions(actions)
+
+def expandCorridorActions(actions):
+    "Flattens a plan whose steps may be tuples of Directions into a list of Directions"
+    directions = []
+    for action in actions:
+        if isinstance(action, tuple):
+            directions.extend(action)
+        else:
+            directions.append(action)
+    return directions
+
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -271,6 +393,10 @@ class CornersProblem(search.SearchProblem):
     This search problem finds paths through all four corners of a layout.
 
     You must select a suitable state space and successor function
+
+    A state is a single int: the index of pacman's cell (in self.cells) times
+    16, plus a mask with bit i set once self.corners[i] has been visited.
+    decodeState turns one back into (position, visited tuple).
     """
 
     def __init__(self, startingGameState):
@@ -287,12 +413,17 @@ class CornersProblem(search.SearchProblem):
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
         # Please add any code here which you would like to use
         # in initializing the problem
-        bl = True if (self.corners[0] == self.startingPosition) else False
-        br = True if (self.corners[2] == self.startingPosition) else False
-        tl = True if (self.corners[1] == self.startingPosition) else False
-        tr = True if (self.corners[3] == self.startingPosition) else False
+        graph = getMazeGraph(self.walls)
+        self.cells = graph.cells
+        self.cellIndex = graph.cellIndex
+        corner_bits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+
+        # neighbors[i] lists (successor cell index << 4 | corner bit, action) for
+        # each legal move out of cells[i], in the order N, S, E, W
+        self.neighbors = [[((self.cellIndex[cell] << 4) | corner_bits.get(cell, 0), action) for cell, action in moves]
+                          for moves in graph.moves]
 
-        self.startState = (tuple([bl, br, tl, tr]), self.startingPosition)
+        self.startState = (self.cellIndex[self.startingPosition] << 4) | corner_bits.get(self.startingPosition, 0)
 
     def getStartState(self):
         """
@@ -307,7 +438,7 @@ class CornersProblem(search.SearchProblem):
         Returns whether this search state is a goal state of the problem.
         """
         "*** YOUR CODE HERE ***"
-        return (list(state[0]) == [True, True, True, True])
+        return state & ALL_CORNERS == ALL_CORNERS
 
     def getSuccessors(self, state):
         """
@@ -320,27 +451,17 @@ class CornersProblem(search.SearchProblem):
             is the incremental cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            x,y = state[1]
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            hitswall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-            if not hitswall:
-                t = list(state[0]).copy()
-                bl = True if (self.corners[0] == (nextx, nexty)) else False
-                br = True if (self.corners[2] == (nextx, nexty)) else False
-                tl = True if (self.corners[1] == (nextx, nexty)) else False
-                tr = True if (self.corners[3] == (nextx, nexty)) else False
-                successors.append(((tuple([bl or t[0], br or t[1], tl or t[2], tr or t[3]]), (nextx, nexty)), action, 1))
+        "*** YOUR CODE HERE ***"
+        visited = state & ALL_CORNERS
+        successors = [(move | visited, action, 1) for move, action in self.neighbors[state >> 4]]
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
 
+    def decodeState(self, state):
+        "Returns (position, visited) where visited[i] says whether corners[i] was reached"
+        return self.cells[state >> 4], tuple(state & (1 << i) != 0 for i in range(len(self.corners)))
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions.  If those actions
@@ -354,6 +475,38 @@ class CornersProblem(search.SearchProblem):
             if self.walls[x][y]: return 999999
         return len(actions)
 
+class CorridorCornersProblem(CornersProblem):
+    """
+    A CornersProblem on the layout's CorridorGraph, with the start and the
+    four corners kept as nodes.  States use the same cell index and corner
+    mask encoding, but each successor runs down a whole corridor, with the
+    corridor's Directions as a tuple action; expandActions flattens a plan.
+    """
+
+    def __init__(self, startingGameState):
+        CornersProblem.__init__(self, startingGameState)
+        # A corner that is a wall is not a cell; like CornersProblem, which has
+        # warned about it, the search then simply never reaches it
+        pinned = tuple(cell for cell in self.corners + (self.startingPosition,) if cell in self.cellIndex)
+        corridors = getCorridorGraph(self.walls, pinned)
+        corner_bits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        self.neighbors = dict((self.cellIndex[node], [((self.cellIndex[end] << 4) | corner_bits.get(end, 0), actions, cost)
+                                                      for end, actions, cost in edges])
+                              for node, edges in corridors.edges.items())
+
+    def getSuccessors(self, state):
+        visited = state & ALL_CORNERS
+        successors = [(move | visited, actions, cost) for move, actions, cost in self.neighbors[state >> 4]]
+
+        self._expanded += 1 # DO NOT CHANGE
+        return successors
+
+    def expandActions(self, actions):
+        "Flattens a plan of corridor action tuples into a list of Directions"
+        return expandCorridorActions(actions)
+
+ALL_CORNERS = 0b1111 # Visited mask of a CornersProblem goal state
+
 def cornersHeuristic(state, problem):
     """
     A heuristic for the CornersProblem that you defined.
@@ -371,22 +524,10 @@ def cornersHeuristic(state, problem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    curr_pos = state[1]
-    corners_reached = list(state[0]).copy()
-    heuristic = []
+    curr_pos = problem.cells[state >> 4]
+    heuristic = [util.manhattanDistance(curr_pos, corner) for i, corner in enumerate(corners) if not state & (1 << i)]
 
-    if corners_reached == [True, True, True, True]:
-        return 0
-    if not corners_reached[0]:
-        heuristic.append(util.manhattanDistance(curr_pos, corners[0]))
-    if not corners_reached[1]:
-        heuristic.append(util.manhattanDistance(curr_pos, corners[2]))
-    if not corners_reached[2]:
-        heuristic.append(util.manhattanDistance(curr_pos, corners[1]))
-    if not corners_reached[3]:
-        heuristic.append(util.manhattanDistance(curr_pos, corners[3]))
-    
-    return max(heuristic) # Default to trivial solution
+    return max(heuristic, default = 0) # Default to trivial solution
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
@@ -477,6 +618,9 @@ def foodHeuristic(state, problem):
     value, try: problem.heuristicInfo['wallCount'] = problem.walls.count()
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
+
+    This is the maze distance to the farthest dot; mstFoodHeuristic is a
+    stronger one (-a heuristic=mstFoodHeuristic).
     """
     position, foodGrid = state
     food_list = foodGrid.asList().copy()
@@ -490,20 +634,70 @@ def foodHeuristic(state, problem):
 
     return max(distance_list)
 
+MST_CACHE_SIZE = 50000 # Remaining-food sets whose MST weight mstFoodHeuristic remembers
+
+def mstFoodHeuristic(state, problem):
+    """
+    The maze distance from pacman to the nearest dot plus the weight of a
+    minimum spanning tree over the remaining dots under maze distance.
+
+    Any path that eats every dot has to reach one of them and then connect
+    all of them, so this never overestimates.  A step changes it by at most
+    one (eating a dot removes a leaf the MST could have used), so it is
+    consistent, and it is never below the farthest-dot distance that
+    foodHeuristic returns.
+
+    MST weights are memoized per remaining-food bitmask in
+    problem.heuristicInfo['mstWeights'], an LRU table holding the
+    MST_CACHE_SIZE most recently used.
+    """
+    position, foodGrid = state
+    food_list = foodGrid.asList()
+    if not food_list:
+        return 0
+
+    oracle = getDistanceOracle(problem.walls)
+    n, distances, cellIndex = len(oracle.cells), oracle.distances, oracle.cellIndex
+    food_indices = [cellIndex[food] for food in food_list]
+    row = cellIndex[position] * n
+    nearest = min(distances[row + food] for food in food_indices)
+
+    weights = problem.heuristicInfo.get('mstWeights')
+    if weights is None:
+        weights = problem.heuristicInfo['mstWeights'] = collections.OrderedDict()
+    key = foodGrid.bits if isinstance(foodGrid, BitGrid) else tuple(food_list)
+    weight = weights.get(key)
+    if weight is None:
+        weight = mstWeight(food_indices, oracle)
+        weights[key] = weight
+        if len(weights) > MST_CACHE_SIZE:
+            weights.popitem(last=False)
+    else:
+        weights.move_to_end(key)
+    return nearest + weight
+
+def mstWeight(cell_indices, oracle):
+    "Total maze distance of a minimum spanning tree over cells of the oracle (Prim's algorithm)"
+    n, distances = len(oracle.cells), oracle.distances
+    tree_node, remaining = cell_indices[0], cell_indices[1:]
+    # Distance from each cell not yet in the tree to its closest tree cell
+    links = [distances[tree_node * n + cell] for cell in remaining]
+    total = 0
+    while remaining:
+        closest = links.index(min(links))
+        total += links.pop(closest)
+        tree_node = remaining.pop(closest)
+        row = tree_node * n
+        links = [min(link, distances[row + cell]) for link, cell in zip(links, remaining)]
+    return total
+
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
-        self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
-            self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+        # The same tour as calling findPathToClosestDot until the food runs
+        # out, but planned on one AnyFoodSearchProblem without generating
+        # the GameStates in between
+        self.actions = planGreedyTour(state)
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -519,7 +713,8 @@ class ClosestDotSearchAgent(SearchAgent):
         problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-        return search.bfs(problem)
+        goal, actions = search.nearestGoalSearch(problem, problem.goals)
+        return actions
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -540,11 +735,16 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         "Stores information from the gameState.  You don't need to change this."
         # Store the food for later reference
         self.food = gameState.getFood()
+        self.goals = set(self.food.asList())
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
+        self.graph = getMazeGraph(self.walls)
+        self.successorTable = self.graph.successorTable(self.costFn)
+        # The goal test never draws, so there is nothing to record for display
+        self.visualize = False
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state):
@@ -552,7 +752,36 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         The state is Pacman's position. Fill this in with a goal test that will
         complete the problem definition.
         """
-        return state in self.food.asList()
+        return state in self.goals
+
+    def getGoalState(self):
+        "Every food dot is a goal, so there is no single state to search back from."
+        return None
+
+def planGreedyTour(gameState):
+    """
+    Returns the actions of a tour from Pacman's position that repeatedly
+    walks to the nearest food dot not yet eaten, until none is left or the
+    rest are unreachable.  Ties go to the dot bfs would reach first.
+
+    Each leg is one search.nearestGoalSearch over a single
+    AnyFoodSearchProblem, whose start is moved to the dot just eaten and
+    whose goal set loses it, so the successor table and the goal set are
+    built once for the whole tour.  The search tree itself is not carried
+    over: a tree rooted at one leg's start gives no distances from the next
+    one, so each leg searches afresh from where the last one ended.
+    """
+    problem = AnyFoodSearchProblem(gameState)
+    goals = problem.goals
+    actions = []
+    while goals:
+        goal, path = search.nearestGoalSearch(problem, goals)
+        if goal is None:
+            break
+        actions += path
+        goals.discard(goal)
+        problem.startState = goal
+    return actions
 
 def mazeDistance(point1, point2, gameState):
     """
@@ -563,11 +792,252 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    Distances come from the shared MazeDistanceOracle for the layout's walls,
+    so only the first call on a layout pays for the BFS.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    distance = getDistanceOracle(walls).getDistance(point1, point2)
+    if distance is None:
+        return 0 # Same as len(search.bfs(prob)) when there is no path
+    return distance
+
+class MazeGraph:
+    """
+    The open cells of a walls Grid and the moves between them.
+
+    cells lists the open positions and cellIndex maps each back to its index.
+    For cell i, moves[i] holds a (neighbor, action) pair for each legal move
+    and reverseMoves[i] a (predecessor, action) pair for each move into it,
+    both in N, S, E, W action order; neighborIndices[i] is moves[i] as cell
+    indices.  Use getMazeGraph to share one graph per layout.
+    """
+
+    def __init__(self, walls):
+        self.walls = walls
+        self.key = layoutHash(walls)
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.moves, self.reverseMoves = [], []
+        for x, y in self.cells:
+            moves, reverseMoves = [], []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not walls[nextx][nexty]:
+                    moves.append(((nextx, nexty), action))
+                prevx, prevy = int(x - dx), int(y - dy)
+                if not walls[prevx][prevy]:
+                    reverseMoves.append(((prevx, prevy), action))
+            self.moves.append(moves)
+            self.reverseMoves.append(reverseMoves)
+        self.neighborIndices = [[self.cellIndex[cell] for cell, action in moves] for moves in self.moves]
+        self._unitSuccessors = None
+
+    def successorTable(self, costFn):
+        """
+        Returns, for each cell index, its list of (successor, action, stepCost)
+        triples.  The unitCost table is built once and shared.
+        """
+        if costFn is unitCost:
+            if self._unitSuccessors is None:
+                self._unitSuccessors = [[(cell, action, 1) for cell, action in moves] for moves in self.moves]
+            return self._unitSuccessors
+        return [[(cell, action, costFn(cell)) for cell, action in moves] for moves in self.moves]
+
+MAZE_GRAPH_CACHE_SIZE = 16 # Layouts whose MazeGraph getMazeGraph keeps
+
+def cachedBuild(cache, key, build, size):
+    """
+    Returns cache[key], calling build() for it on a miss.  cache is an
+    OrderedDict kept to the size most recently used entries.
+    """
+    value = cache.get(key)
+    if value is None:
+        value = cache[key] = build()
+        if len(cache) > size:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return value
+
+_mazeGraphs = collections.OrderedDict()
+_lastMazeGraph = (None, None) # (walls, graph) of the last call
+
+def getMazeGraph(walls):
+    "Returns the shared MazeGraph for a walls Grid, building it on first use"
+    global _lastMazeGraph
+    # Every state of a game shares one walls Grid, so check it against the last
+    # call's before hashing; holding on to that Grid keeps the check sound
+    lastWalls, graph = _lastMazeGraph
+    if lastWalls is walls:
+        return graph
+    graph = cachedBuild(_mazeGraphs, layoutHash(walls), lambda: MazeGraph(walls), MAZE_GRAPH_CACHE_SIZE)
+    _lastMazeGraph = (walls, graph)
+    return graph
+
+class CorridorGraph:
+    """
+    A MazeGraph with its corridors contracted.  The nodes are the open cells
+    that are not in the middle of a corridor (junctions and dead ends, i.e.
+    cells without exactly two open neighbors) plus any pinned cells, and an
+    edge is a run of corridor cells from one node to the next.
+
+    edges[node] lists (node, actions, cost) triples, where actions is the
+    tuple of Directions along the corridor and cost the sum of costFn over
+    the cells it enters; reverseEdges[node] holds the same edges keyed by
+    the node they end at.  Corridors not reachable from any node (a loop
+    with no junction or pinned cell on it) are left out.
+    """
+
+    def __init__(self, graph, pinned=(), costFn=unitCost):
+        self.graph = graph
+        moves = graph.moves
+        cellIndex = graph.cellIndex
+        self.nodes = set(cell for cell, cell_moves in zip(graph.cells, moves) if len(cell_moves) != 2)
+        self.nodes.update(pinned)
+
+        self.edges = dict((node, []) for node in self.nodes)
+        self.reverseEdges = dict((node, []) for node in self.nodes)
+        for node in self.nodes:
+            for cell, action in moves[cellIndex[node]]:
+                previous, actions, cost = node, [action], costFn(cell)
+                while cell not in self.nodes:
+                    # A corridor cell has two moves; take the one that doesn't go back
+                    first, second = moves[cellIndex[cell]]
+                    step = second if first[0] == previous else first
+                    previous, (cell, action) = cell, step
+                    actions.append(action)
+                    cost += costFn(cell)
+                if cell != node:
+                    self.edges[node].append((cell, tuple(actions), cost))
+                    self.reverseEdges[cell].append((node, tuple(actions), cost))
+
+CORRIDOR_GRAPH_CACHE_SIZE = 64 # (layout, pinned cells) pairs whose CorridorGraph getCorridorGraph keeps
+
+_corridorGraphs = collections.OrderedDict()
+
+def getCorridorGraph(walls, pinned=(), costFn=unitCost):
+    """
+    Returns a CorridorGraph for a walls Grid with the given cells kept as
+    nodes.  Graphs for unitCost are shared between problems with the same
+    walls and pinned cells.
+    """
+    graph = getMazeGraph(walls)
+    if costFn is not unitCost:
+        return CorridorGraph(graph, pinned, costFn)
+    return cachedBuild(_corridorGraphs, (graph.key, frozenset(pinned)), lambda: CorridorGraph(graph, pinned),
+                       CORRIDOR_GRAPH_CACHE_SIZE)
+
+# Directory for on-disk distance tables (None keeps them in memory only).  It
+# starts as $PACMAN_DISTANCE_CACHE and is changed with setDistanceCacheDir,
+# which SearchAgent's distanceCache=<dir> argument calls.
+DISTANCE_CACHE_DIR = os.environ.get('PACMAN_DISTANCE_CACHE') or None
+DISTANCE_ORACLE_CACHE_SIZE = 4 # Layouts whose MazeDistanceOracle getDistanceOracle keeps
+
+class MazeDistanceOracle:
+    """
+    All-pairs maze distances for one walls Grid.
+
+    Every open cell gets an index, and a BFS from each of them fills one row of
+    an n x n array of distances, so getDistance is a pair of dict lookups and
+    an array index.  If cacheDir is given, the array is written there under a
+    hash of the walls and memory-mapped back in, so later runs on the same
+    layout skip the BFS entirely.
+    """
+
+    def __init__(self, walls, cacheDir=None):
+        self.walls = walls
+        self.graph = getMazeGraph(walls)
+        self.cells = self.graph.cells
+        self.cellIndex = self.graph.cellIndex
+        n = len(self.cells)
+        self.typecode = 'H' if n < 0xFFFF else 'I'
+        self.unreachable = 0xFFFF if self.typecode == 'H' else 0xFFFFFFFF
+        self.key = self.graph.key
+
+        self.distances = None
+        path = None
+        if cacheDir is not None:
+            path = os.path.join(cacheDir, '%s-%s.dist' % (self.key, self.typecode))
+            self.distances = self._load(path, n)
+        if self.distances is None:
+            self.distances = self._compute()
+            if path is not None:
+                self._save(path)
+
+    def getDistance(self, point1, point2):
+        "Returns the maze distance between two open cells, or None if there is no path"
+        i, j = self.cellIndex[point1], self.cellIndex[point2]
+        distance = self.distances[i * len(self.cells) + j]
+        if distance == self.unreachable:
+            return None
+        return distance
+
+    def _compute(self):
+        n = len(self.cells)
+        neighbors = self.graph.neighborIndices
+
+        distances = array.array(self.typecode, [self.unreachable]) * (n * n)
+        for source in range(n):
+            row = source * n
+            distances[row + source] = 0
+            frontier = [source]
+            depth = 0
+            while frontier:
+                depth += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for neighbor in neighbors[cell]:
+                        if distances[row + neighbor] == self.unreachable:
+                            distances[row + neighbor] = depth
+                            nextFrontier.append(neighbor)
+                frontier = nextFrontier
+        return distances
+
+    def _load(self, path, n):
+        itemsize = array.array(self.typecode).itemsize
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size != n * n * itemsize or n == 0:
+                    return None
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        return memoryview(mapped).cast(self.typecode)
+
+    def _save(self, path):
+        # Write to a temporary file first so a concurrent reader never maps a partial table
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmpPath = '%s.%d.tmp' % (path, os.getpid())
+            with open(tmpPath, 'wb') as f:
+                self.distances.tofile(f)
+            os.replace(tmpPath, path)
+        except OSError as e:
+            print('Warning: could not cache maze distances in %s (%s)' % (path, e))
+
+def layoutHash(walls):
+    "A stable hex digest identifying a walls Grid"
+    return hashlib.sha1(('%d,%d\n%s' % (walls.width, walls.height, walls)).encode()).hexdigest()
+
+_distanceOracles = collections.OrderedDict()
+
+def getDistanceOracle(walls):
+    "Returns the shared MazeDistanceOracle for a walls Grid, building it on first use"
+    return cachedBuild(_distanceOracles, getMazeGraph(walls).key,
+                       lambda: MazeDistanceOracle(walls, DISTANCE_CACHE_DIR), DISTANCE_ORACLE_CACHE_SIZE)
+
+def setDistanceCacheDir(cacheDir):
+    """
+    Sets the directory getDistanceOracle keeps distance tables in, or None
+    for memory only.  Oracles built before are dropped, so the next lookup
+    on each layout reads (or writes) its table there.
+    """
+    global DISTANCE_CACHE_DIR
+    DISTANCE_CACHE_DIR = cacheDir
+    _distanceOracles.clear()